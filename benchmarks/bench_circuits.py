@@ -0,0 +1,32 @@
+"""Parsing circuits and preparing them for execution, which also runs on every keystroke in the editor."""
+import pytest
+
+from conftest import QUBITS, DEPTHS
+
+
+@pytest.mark.parametrize("num_gates", DEPTHS)
+def bench_parse_circuit(benchmark, simulator, program, measure_peak_memory, num_gates):
+    qasm_str = program(8, num_gates)
+
+    measure_peak_memory(simulator._parse_circuit, qasm_str)
+    benchmark(simulator._parse_circuit, qasm_str)
+
+
+@pytest.mark.parametrize("num_gates", DEPTHS)
+def bench_load_circuit_cached(benchmark, simulator, program, num_gates):
+    qasm_str = program(8, num_gates)
+    simulator.load_circuit(qasm_str)
+
+    # Every later load is a hit in the shared circuit cache
+    benchmark(simulator.load_circuit, qasm_str)
+
+
+@pytest.mark.parametrize("num_qubits", QUBITS)
+@pytest.mark.parametrize("num_gates", DEPTHS)
+def bench_insert_save_statevectors(benchmark, simulator, program, measure_peak_memory, num_qubits, num_gates):
+    from qnex.backend.qiskit.qiskit_utils import insert_save_statevectors
+
+    circuit = simulator.load_circuit(program(num_qubits, num_gates))
+
+    measure_peak_memory(insert_save_statevectors, circuit)
+    benchmark(insert_save_statevectors, circuit)
@@ -0,0 +1,29 @@
+"""Building noise models from the custom noise editor and from device profiles."""
+import pytest
+
+from qnex.backend.types import NoiseParameterType
+
+
+def noise_params(noise_type: NoiseParameterType, gates: list[str]) -> dict:
+    """Apply a single kind of noise to every given gate, in the format of the noise model editor."""
+    value = True if noise_type == NoiseParameterType.THERMAL_RELAXATION else 1
+
+    return {gate: {noise_type.value: value, "gate_time": 50, "t1": 19000, "t2": 20000} for gate in gates}
+
+
+@pytest.mark.parametrize("noise_type", list(NoiseParameterType), ids=lambda noise_type: noise_type.value)
+def bench_create_noise_model(benchmark, simulator, noise_type):
+    params = noise_params(noise_type, ["measure"] if noise_type == NoiseParameterType.READOUT_ERROR else ["h", "x", "cx", "rz"])
+
+    benchmark(simulator.create_noise_model, params)
+
+
+@pytest.mark.parametrize("profile", ["ibm-santiago", "ibm-oslo", "ibm-kyiv"])
+def bench_noise_model_from_backend(benchmark, simulator, measure_peak_memory, profile):
+    from qiskit_aer.noise import NoiseModel
+
+    backend = simulator.load_backend(profile)
+
+    measure_peak_memory(NoiseModel.from_backend, backend)
+    # Slow for large devices, so fewer rounds than the default
+    benchmark.pedantic(NoiseModel.from_backend, args=(backend,), rounds=3, iterations=1)
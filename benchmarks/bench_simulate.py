@@ -0,0 +1,109 @@
+"""Aer runs and turning their per-shot statevectors into results, the bulk of every simulation."""
+from dataclasses import asdict
+
+import numpy as np
+import pytest
+
+from bench_noise import noise_params
+from conftest import QUBITS, SHOTS, DEPTHS
+from qnex.backend.types import NoiseParameterType, SimulationOptions
+
+# Statevectors saved for every shot grow with 2^n, so the larger registers only keep the initial and final state
+FULL_SNAPSHOT_QUBITS = 8
+
+
+def prepare(simulator, program, num_qubits: int, num_gates: int):
+    from qnex.backend.qiskit.qiskit_utils import insert_save_statevectors
+
+    circuit = simulator.load_circuit(program(num_qubits, num_gates))
+    stride = 1 if num_qubits <= FULL_SNAPSHOT_QUBITS else max(len(circuit.data), 1)
+
+    return insert_save_statevectors(circuit, stride=stride)
+
+
+@pytest.mark.parametrize("num_qubits", QUBITS)
+def bench_execute_qubits(benchmark, simulator, program, measure_peak_memory, num_qubits):
+    circuit = prepare(simulator, program, num_qubits, 100)
+
+    measure_peak_memory(simulator.execute, circuit, 64, 1)
+    benchmark(simulator.execute, circuit, 64, 1)
+
+
+@pytest.mark.parametrize("shots", SHOTS)
+def bench_execute_shots(benchmark, simulator, program, measure_peak_memory, shots):
+    circuit = prepare(simulator, program, 4, 100)
+
+    measure_peak_memory(simulator.execute, circuit, shots, 1)
+    benchmark(simulator.execute, circuit, shots, 1)
+
+
+@pytest.mark.parametrize("num_gates", DEPTHS)
+def bench_execute_depth(benchmark, simulator, program, num_gates):
+    circuit = prepare(simulator, program, 4, num_gates)
+
+    benchmark(simulator.execute, circuit, 64, 1)
+
+
+@pytest.mark.parametrize("noise_type", [noise_type for noise_type in NoiseParameterType if noise_type != NoiseParameterType.READOUT_ERROR],
+                         ids=lambda noise_type: noise_type.value)
+def bench_execute_noisy(benchmark, simulator, program, noise_type):
+    circuit = prepare(simulator, program, 4, 100)
+
+    supported = simulator.supported_operations()
+    gates = [gate for gate in set(simulator.used_operations(program(4, 100))) if gate in supported and gate not in ["measure", "barrier"]]
+    noise_model = simulator.create_noise_model(noise_params(noise_type, gates))
+
+    benchmark(simulator.execute, circuit, 256, 1, noise_model)
+
+
+@pytest.mark.parametrize("num_qubits", [1, 4, 8])
+@pytest.mark.parametrize("shots", [64, 1024])
+def bench_build_result(benchmark, simulator, program, measure_peak_memory, num_qubits, shots):
+    circuit = prepare(simulator, program, num_qubits, 100)
+    operations = simulator._step_operations(simulator.load_circuit(program(num_qubits, 100)))
+    basis_states = simulator._basis_states(circuit.num_qubits)
+    execution = simulator.execute(circuit, shots, 1)
+    options = SimulationOptions()
+
+    def build():
+        return simulator._build_result(basis_states, operations, execution, execution, 1, options)
+
+    measure_peak_memory(build)
+    benchmark(build)
+
+
+@pytest.mark.parametrize("shots", [64, 1024])
+def bench_serialize_result(benchmark, simulator, program, measure_peak_memory, shots):
+    from plotly.io.json import to_json_plotly
+
+    # Same path as the simulation results store of the dashboard
+    result = simulator.simulate(program(4, 100), shots, 1, "custom", None, SimulationOptions(cache_results=False))
+
+    def serialize():
+        return to_json_plotly(asdict(result))
+
+    measure_peak_memory(serialize)
+    benchmark.extra_info["payload_bytes"] = len(serialize())
+    benchmark(serialize)
+
+
+@pytest.mark.parametrize("num_qubits", QUBITS)
+def bench_compute_quantum_fidelity(benchmark, num_qubits):
+    from qnex.utils.quantum import compute_quantum_fidelity
+
+    rng = np.random.default_rng(1)
+    sv1, sv2 = rng.normal(size=(2, 2 ** num_qubits)) + 1j * rng.normal(size=(2, 2 ** num_qubits))
+
+    benchmark(compute_quantum_fidelity, sv1, sv2)
+
+
+@pytest.mark.parametrize("num_qubits", QUBITS)
+def bench_compute_batched_fidelity(benchmark, num_qubits):
+    from qnex.utils.quantum import compute_batched_fidelity
+
+    # One step of up to 1024 shots, fewer for large registers to stay within 16 MB per batch
+    rng = np.random.default_rng(1)
+    shape = (2, min(1024, 2 ** 20 // 2 ** num_qubits), 2 ** num_qubits)
+    svs1, svs2 = rng.normal(size=shape) + 1j * rng.normal(size=shape)
+
+    benchmark(compute_batched_fidelity, svs1, svs2)
@@ -0,0 +1,59 @@
+"""
+Shared setup of the pytest-benchmark suite.
+
+The suite runs against its own cache directory and a single worker process, so timings measure the code paths
+themselves rather than cache hits from earlier runs or scheduling on the process pool. Both can be overridden through
+QNEX_CACHE_DIR and QNEX_WORKERS.
+"""
+import os
+import tempfile
+import tracemalloc
+from typing import Callable
+
+# Must be set before qnex.utils.cache is first imported
+os.environ.setdefault("QNEX_CACHE_DIR", tempfile.mkdtemp(prefix="qnex-benchmarks-"))
+os.environ.setdefault("QNEX_WORKERS", "1")
+
+import pytest  # noqa: E402
+
+from parse_time import generate_program  # noqa: E402
+
+QUBITS = [1, 2, 4, 8, 12, 16]
+SHOTS = [1, 64, 1024, 8192]
+DEPTHS = [10, 100, 1000]
+
+
+@pytest.fixture(scope="session")
+def simulator():
+    from qnex.backend.qiskit.qiskit_simulator import QiskitSimulator
+
+    return QiskitSimulator()
+
+
+@pytest.fixture(scope="session")
+def program() -> Callable[..., str]:
+    """Return a generator of reproducible OpenQASM 3 programs with a given number of qubits and gates."""
+    return lambda num_qubits, num_gates: generate_program(num_gates, num_qubits, version=3)
+
+
+@pytest.fixture
+def measure_peak_memory(benchmark) -> Callable:
+    """
+    Run a function once more under tracemalloc and record its peak in the benchmark's extra info.
+
+    Only allocations made through Python's allocator are seen, which covers the NumPy arrays and result objects but
+    not Aer's own C++ buffers. The timed rounds run without tracing, so the overhead does not skew the timings.
+    """
+    def measure(fn: Callable, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            fn(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        benchmark.extra_info["peak_memory_bytes"] = peak
+
+        return peak
+
+    return measure
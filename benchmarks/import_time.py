@@ -0,0 +1,80 @@
+"""
+Summarize ``python -X importtime`` for the QNEX entry points.
+
+Each module is imported in a fresh interpreter, so the report reflects what a worker restart or a freshly scaled
+replica pays before it can serve its first request.
+
+Usage:
+    poetry run python benchmarks/import_time.py
+    poetry run python benchmarks/import_time.py qnex.dashboard.app --top 25
+"""
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+
+DEFAULT_MODULES = [
+    "qnex.backend.registry",
+    "qnex.dashboard.app",
+]
+
+# Packages that should not be imported while the dashboard starts up
+HEAVY_PACKAGES = ["qiskit", "qiskit_aer", "qiskit_ibm_runtime", "matplotlib", "scipy"]
+
+
+@dataclass
+class ImportTiming:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_import_time(module: str) -> list[ImportTiming]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+
+    return timings
+
+
+def summarize(module: str, timings: list[ImportTiming], top: int):
+    by_name = {timing.name: timing for timing in timings}
+    total = by_name[module].cumulative_us if module in by_name else sum(timing.self_us for timing in timings)
+    heavy = sorted({timing.name.split(".")[0] for timing in timings} & set(HEAVY_PACKAGES))
+
+    print(f"== {module}: {total / 1000:.1f} ms total, {len(timings)} modules")
+    print(f"   heavy packages imported: {', '.join(heavy) if heavy else 'none'}")
+
+    print(f"   {'cumulative [ms]':>16} {'self [ms]':>10}  package")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        print(f"   {timing.cumulative_us / 1000:>16.1f} {timing.self_us / 1000:>10.1f}  {'  ' * timing.depth}{timing.name}")
+
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show per module")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        summarize(module, measure_import_time(module), args.top)
+
+
+if __name__ == '__main__':
+    main()
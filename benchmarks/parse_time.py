@@ -0,0 +1,113 @@
+"""
+Compare OpenQASM parse times of the available Qiskit importers on generated programs.
+
+Every program is parsed several times in the same interpreter and the fastest run is reported, so the numbers reflect
+the parsers rather than import or warm-up costs. The "qnex" column is the path the simulator takes, without its cache.
+
+Usage:
+    poetry run python benchmarks/parse_time.py
+    poetry run python benchmarks/parse_time.py --gates 10 1000 --qubits 8 --repeats 3
+"""
+import argparse
+import random
+import time
+from typing import Callable, Optional
+
+DEFAULT_GATES = [10, 100, 1000, 10000]
+
+ONE_QUBIT_GATES = ["h", "x", "y", "z", "s", "t", "sdg", "tdg"]
+TWO_QUBIT_GATES = ["cx", "cz", "swap"]
+
+
+def generate_program(num_gates: int, num_qubits: int, version: int, seed: int = 0) -> str:
+    """Return a random program of one- and two-qubit gates and rotations, followed by measuring every qubit."""
+    rng = random.Random(seed)
+
+    if version == 3:
+        lines = ["OPENQASM 3.0;", 'include "stdgates.inc";', f"qubit[{num_qubits}] q;", f"bit[{num_qubits}] c;"]
+    else:
+        lines = ["OPENQASM 2.0;", 'include "qelib1.inc";', f"qreg q[{num_qubits}];", f"creg c[{num_qubits}];"]
+
+    for _ in range(num_gates):
+        kind = rng.random()
+
+        if kind < 0.5 or num_qubits < 2:
+            lines.append(f"{rng.choice(ONE_QUBIT_GATES)} q[{rng.randrange(num_qubits)}];")
+        elif kind < 0.7:
+            lines.append(f"rz({rng.uniform(0, 6.283):.6f}) q[{rng.randrange(num_qubits)}];")
+        else:
+            control, target = rng.sample(range(num_qubits), 2)
+            lines.append(f"{rng.choice(TWO_QUBIT_GATES)} q[{control}], q[{target}];")
+
+    if version == 3:
+        lines.append("c = measure q;")
+    else:
+        lines.append("measure q -> c;")
+
+    return "\n".join(lines)
+
+
+def time_parser(parse: Callable[[str], object], program: str, repeats: int) -> Optional[float]:
+    """Return the fastest of several parses in milliseconds, or None if the parser rejects the program."""
+    best = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        try:
+            parse(program)
+        except Exception:
+            return None
+        elapsed = (time.perf_counter() - start) * 1000
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def available_parsers() -> dict[int, dict[str, Callable[[str], object]]]:
+    from qiskit import qasm2, qasm3
+
+    from qnex.backend.qiskit.qiskit_simulator import QiskitSimulator
+
+    qasm3_parsers = {"qasm3.loads": qasm3.loads}
+    if hasattr(qasm3, "loads_experimental"):
+        qasm3_parsers["qasm3.loads_experimental"] = qasm3.loads_experimental
+    qasm3_parsers["qnex"] = QiskitSimulator._parse_circuit
+
+    return {
+        2: {"qasm2.loads": qasm2.loads, "qnex": QiskitSimulator._parse_circuit},
+        3: qasm3_parsers,
+    }
+
+
+def format_time(milliseconds: Optional[float]) -> str:
+    return "failed" if milliseconds is None else f"{milliseconds:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gates", type=int, nargs="+", default=DEFAULT_GATES, help="Number of gates of the generated programs")
+    parser.add_argument("--qubits", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5, help="Number of parses per program, the fastest is reported")
+    parser.add_argument("--version", type=int, choices=[2, 3], nargs="+", default=[3, 2])
+    args = parser.parse_args()
+
+    parsers = available_parsers()
+
+    for version in args.version:
+        names = list(parsers[version])
+
+        print(f"== OpenQASM {version}, {args.qubits} qubits, best of {args.repeats} [ms]")
+        print(f"   {'gates':>8}" + "".join(f"{name:>26}" for name in names))
+
+        for num_gates in args.gates:
+            program = generate_program(num_gates, args.qubits, version)
+            timings = [time_parser(parsers[version][name], program, args.repeats) for name in names]
+
+            print(f"   {num_gates:>8}" + "".join(f"{format_time(timing):>26}" for timing in timings))
+
+        print()
+
+
+if __name__ == '__main__':
+    main()
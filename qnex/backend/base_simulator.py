@@ -1,7 +1,20 @@
 from abc import ABC, abstractmethod
+from dataclasses import replace, asdict
 from typing import Optional
 
-from qnex.backend.types import Gate, SimulationResult
+from qnex.backend.types import Gate, SimulationResult, SimulationOptions, CostEstimate, SweepResult, SensitivityResult
+from qnex.utils.hashing import stable_hash
+from qnex.utils.parallel import default_workers
+
+
+class SimulationBudgetError(Exception):
+    """Raised before a simulation starts when it cannot be fitted within the memory budget."""
+
+    def __init__(self, estimate: CostEstimate, budget: int):
+        super().__init__(f"Simulation needs an estimated {estimate.memory_bytes / 1024 ** 2:.0f} MB, "
+                         f"exceeding the budget of {budget / 1024 ** 2:.0f} MB")
+        self.estimate = estimate
+        self.budget = budget
 
 
 class BaseSimulator(ABC):
@@ -11,10 +24,108 @@ class BaseSimulator(ABC):
         pass
 
     @abstractmethod
-    def simulate(self, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str, noise_params: Optional[dict]) -> SimulationResult:
-        """Run the simulation with the given noise parameters."""
+    def simulate(self, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str, noise_params: Optional[dict],
+                 options: Optional[SimulationOptions] = None) -> SimulationResult:
+        """
+        Run the simulation with the given noise parameters.
+
+        Observables requested through the options are evaluated at every step and returned as a (steps x observables)
+        summary, which together with store_statevectors=False avoids shipping the full per-shot statevectors.
+        """
         pass
 
+    def simulate_many(self, qasm_str: str, shots: int, seed: Optional[int], profiles: list[str], noise_params: Optional[dict],
+                      options: Optional[SimulationOptions] = None) -> dict[str, SimulationResult]:
+        """Run the simulation for several noise profiles, returning the result of each profile."""
+        return {profile: self.simulate(qasm_str, shots, seed, profile, noise_params, options) for profile in profiles}
+
+    def sweep(self, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str, noise_params: Optional[dict],
+              parameter_values: dict[str, list[float]], options: Optional[SimulationOptions] = None) -> SweepResult:
+        """Run the circuit for every point of a parameter sweep, given as parameter name -> one value per point."""
+        raise NotImplementedError(f"{type(self).__name__} does not support parameter sweeps")
+
+    def sensitivity(self, qasm_str: str, shots: int, seed: Optional[int], noise_params: dict,
+                    options: Optional[SimulationOptions] = None) -> SensitivityResult:
+        """Measure how much the noise of every gate in a custom noise model contributes to the infidelity."""
+        raise NotImplementedError(f"{type(self).__name__} does not support sensitivity analysis")
+
+    @abstractmethod
+    def estimate_cost(self, qasm_str: str, shots: int, options: Optional[SimulationOptions] = None) -> CostEstimate:
+        """Predict the memory, payload size and runtime of a simulation without running it."""
+        pass
+
+    @staticmethod
+    def concurrent_repetitions(options: SimulationOptions) -> int:
+        """Return how many repetitions are held in memory at once, one per pool worker and one in the calling process."""
+        if options.repetitions <= 1 or default_workers() <= 1:
+            return 1
+
+        return min(options.repetitions, default_workers() + 1)
+
+    def fit_to_budget(self, qasm_str: str, shots: int, options: SimulationOptions, runs: int = 1,
+                      streaming: bool = True) -> tuple[SimulationOptions, CostEstimate]:
+        """
+        Return options whose estimated memory fits the budget, falling back to sparser outputs when allowed.
+
+        The estimate covers a single ideal and noisy run, its memory is multiplied by the number of such runs held at once.
+        Runs that keep every trajectory in memory before selecting the stored ones are estimated with streaming=False and
+        never fall back to fewer stored trajectories.
+
+        Raises SimulationBudgetError when no cheaper configuration fits.
+        """
+        def estimate(candidate: SimulationOptions) -> CostEstimate:
+            single = self.estimate_cost(qasm_str, shots, candidate if streaming else replace(candidate, stored_trajectories=None))
+
+            return replace(single, memory_bytes=single.memory_bytes * runs)
+
+        def fits(cost: CostEstimate) -> bool:
+            return cost.memory_bytes <= options.memory_budget
+
+        cost = estimate(options)
+
+        if options.memory_budget is None or fits(cost):
+            return options, cost
+
+        if not options.budget_fallback:
+            raise SimulationBudgetError(cost, options.memory_budget)
+
+        # Leave the amplitudes out of the result first, the probabilities, counts and diagnostics remain
+        candidate = replace(options, store_statevectors=False)
+        cost = estimate(candidate)
+
+        if fits(cost):
+            return candidate, cost
+
+        # Halve the number of snapshots until the run fits, down to only the initial and final state
+        stride = max(options.snapshot_stride, 1)
+
+        while stride < cost.num_instructions:
+            stride = min(stride * 2, cost.num_instructions)
+            candidate = replace(candidate, snapshot_stride=stride)
+            cost = estimate(candidate)
+
+            if fits(cost):
+                return candidate, cost
+
+        # Finally keep the trajectories of fewer shots, all shots still count towards the statistics
+        if streaming and not options.adaptive:
+            stored = min(options.stored_trajectories or shots, shots)
+
+            while stored > 1:
+                stored //= 2
+                candidate = replace(candidate, stored_trajectories=stored)
+                cost = estimate(candidate)
+
+                if fits(cost):
+                    return candidate, cost
+
+        raise SimulationBudgetError(cost, options.memory_budget)
+
+    def result_cache_key(self, qasm_str: str, shots: int, seed: int, noise_profile_name: str, noise_params: Optional[dict],
+                         options: SimulationOptions) -> str:
+        """Return the key a deterministic (seeded) simulation result is cached under."""
+        return stable_hash(type(self).__name__, qasm_str, shots, seed, noise_profile_name, noise_params, asdict(options))
+
     def supported_profiles(self) -> list[str]:
         """Return a list of supported profiles."""
         pass
@@ -1,22 +1,43 @@
 import importlib
+import logging
+from collections import Counter
 import random
-from typing import Optional
+import time
+from dataclasses import replace
+from typing import Optional, TYPE_CHECKING
 
 import numpy as np
 from natsort import natsorted
-from qiskit import qasm3, qasm2
-from qiskit_aer import QasmSimulator
-from qiskit_aer.noise import NoiseModel, pauli_error, amplitude_damping_error, phase_damping_error, depolarizing_error, thermal_relaxation_error, ReadoutError
 
-from qnex.backend.base_simulator import BaseSimulator
-from qnex.backend.qiskit.qiskit_utils import insert_save_statevectors
-from qnex.backend.types import NoiseParameterType, Gate, StatevectorResult, SimulationResult
+from qnex.backend.base_simulator import BaseSimulator, SimulationBudgetError
+from qnex.backend.qiskit.qiskit_utils import insert_save_statevectors, Execution, merge_executions, TranspiledCircuit, transpile_for_backend, \
+    snapshot_steps, estimate_statevector_cost, compute_state_diagnostics, compute_observable_estimates, bind_parameters, TrajectoryAggregates, \
+    select_trajectories, compute_observable_values, summarize_observable_sums, split_readout_errors, measured_qubits, apply_readout_to_counts, \
+    apply_readout_to_histogram, counts_to_basis_vector, has_gate_noise, scale_gate_noise, sniff_qasm_version, parse_qasm3, restore_final_layout, \
+    TRANSPILED_LAYOUT_VERSION
+from qnex.backend.types import NoiseParameterType, Gate, StatevectorResult, SimulationResult, SimulationOptions, IntervalEstimate, \
+    RepetitionStatistics, AdaptiveShotSummary, CostEstimate, SweepResult, ObservableEstimates, \
+    GateSensitivity, SensitivityResult
+from qnex.utils.cache import get_or_compute, get_shared_cache
 from qnex.utils.complex_utils import serialize_complex_array
+from qnex.utils.hashing import stable_hash
+from qnex.utils.metrics import span
+from qnex.utils.parallel import submit, set_default_workers
+from qnex.utils.quantum import compute_batched_fidelity, apply_readout_confusion
+from qnex.utils.seeding import spawn_seeds, seed_stream
+from qnex.utils.statistics import mean_confidence_interval
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from qiskit_aer import QasmSimulator
+    from qiskit_aer.noise import NoiseModel
 
 
 class QiskitSimulator(BaseSimulator):
     def __init__(self):
-        self.simulator = QasmSimulator()
+        # Qiskit and Aer are heavy to import, so the simulator is only constructed once it is first used
+        self._simulator: Optional["QasmSimulator"] = None
         self.profile_backends: dict[str, str] = {
             'ibm-santiago': 'qiskit_ibm_runtime.fake_provider.fake_provider.FakeSantiagoV2',
             'ibm-oslo': 'qiskit_ibm_runtime.fake_provider.fake_provider.FakeOslo',
@@ -24,8 +45,21 @@ class QiskitSimulator(BaseSimulator):
             # Add more backends here as needed
         }
 
+    @property
+    def simulator(self) -> "QasmSimulator":
+        if self._simulator is None:
+            from qiskit_aer import QasmSimulator
+
+            self._simulator = QasmSimulator()
+
+        return self._simulator
+
     def load_backend(self, profile_name: str):
         """Dynamically load a backend by name."""
+        with span("backend_load"):
+            return self._load_backend(profile_name)
+
+    def _load_backend(self, profile_name: str):
         try:
             backend_module = self.profile_backends.get(profile_name)
             if profile_name not in self.profile_backends:
@@ -40,17 +74,25 @@ class QiskitSimulator(BaseSimulator):
             # Instantiate the class
             return backend_class()
         except (ImportError, AttributeError, ValueError) as e:
-            print(f"Error loading backend {profile_name}: {e}")
+            logger.error("Error loading backend %s: %s", profile_name, e)
             return None
 
     def supported_profiles(self) -> list[str]:
         return list(self.profile_backends.keys())
 
     def load_circuit(self, qasm_str: str):
-        # Check the QASM version in the input string
-        if "OPENQASM 3.0;" in qasm_str:
+        # Parsed circuits are shared between workers, unpickling is much cheaper than parsing
+        with span("parse"):
+            return get_or_compute("circuits", stable_hash(qasm_str), lambda: self._parse_circuit(qasm_str))
+
+    @staticmethod
+    def _parse_circuit(qasm_str: str):
+        from qiskit import qasm2
+
+        # Check the QASM version declared in the header
+        if sniff_qasm_version(qasm_str) >= 3:
             # Parse the QASM string as qasm3
-            circuit = qasm3.loads(qasm_str)
+            circuit = parse_qasm3(qasm_str)
         else:
             # Parse the QASM string as qasm2 (default or assumed version)
             circuit = qasm2.loads(qasm_str)
@@ -58,7 +100,16 @@ class QiskitSimulator(BaseSimulator):
         # Insert save statevectors into the circuit
         return circuit
 
-    def create_noise_model(self, noise_model: dict) -> NoiseModel:
+    def estimate_cost(self, qasm_str: str, shots: int, options: Optional[SimulationOptions] = None) -> CostEstimate:
+        options = options or SimulationOptions()
+        circuit = self.load_circuit(qasm_str)
+
+        return estimate_statevector_cost(circuit.num_qubits, len(circuit.data), shots, options.snapshot_stride, options.store_statevectors,
+                                         None if options.adaptive else options.stored_trajectories, options.batch_shots)
+
+    def create_noise_model(self, noise_model: dict) -> "NoiseModel":
+        from qiskit_aer.noise import NoiseModel, ReadoutError, thermal_relaxation_error
+
         model = NoiseModel()
         supported_gates = self.supported_operations()
 
@@ -66,7 +117,7 @@ class QiskitSimulator(BaseSimulator):
             quantum_errors = []
             gate = supported_gates[gate_ref]
 
-            print(f"Applying noise to gate: {gate}, {noise_model_gate}")
+            logger.debug("Applying noise to gate: %s, %s", gate, noise_model_gate)
 
             if gate_ref == "measure":
                 # Handle readout error separately for the "measure" gate
@@ -116,6 +167,8 @@ class QiskitSimulator(BaseSimulator):
 
     def _create_noise_error(self, noise_type: NoiseParameterType, prob: float, num_qubits: int):
         """Helper method to create the correct error for a given noise type and probability."""
+        from qiskit_aer.noise import pauli_error, amplitude_damping_error, phase_damping_error, depolarizing_error
+
         normalized_prob = max(min(prob, 1), 0)
 
         if noise_type == NoiseParameterType.BIT_FLIP:
@@ -131,63 +184,697 @@ class QiskitSimulator(BaseSimulator):
 
         return None
 
-    def simulate(self, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str, noise_params: Optional[dict] = None) -> SimulationResult:
-        # Loaded
-        circuit = insert_save_statevectors(self.load_circuit(qasm_str))
+    def resolve_noise_model(self, noise_profile_name: str, noise_params: Optional[dict] = None) -> "NoiseModel":
+        """Build the noise model for a device profile, a custom noise configuration or an ideal run."""
+        from qiskit_aer.noise import NoiseModel
+
+        # Apply noise model based on the provided input
+        if noise_profile_name and noise_profile_name != 'custom':
+            # Load noise model from a specific backend (quantum computer) using its profile name, this is slow for large devices
+            import qiskit_aer
+
+            return get_or_compute(
+                "noise_models",
+                stable_hash(noise_profile_name, qiskit_aer.__version__),
+                lambda: NoiseModel.from_backend(self.load_backend(noise_profile_name))
+            )
+        elif noise_params and noise_profile_name == 'custom':
+            # If noise params are provided, create a custom noise model
+            return self.create_noise_model(noise_params)
+
+        # If no noise info is provided, use a default (ideal) noise model
+        return NoiseModel()  # This creates an ideal model (no noise)
+
+    def transpile_for_profiles(self, qasm_str: str, circuit, profiles: list[str], optimization_level: int, seed: int) -> dict[str, TranspiledCircuit]:
+        """
+        Transpile the circuit to the basis gates and coupling map of each device profile.
+
+        Results are cached by circuit hash, profile, optimization level and seed, cache misses are transpiled in parallel.
+        """
+        cache = get_shared_cache("transpiled")
+        circuit_hash = stable_hash(qasm_str)
+
+        keys = {
+            profile: stable_hash(circuit_hash, profile, optimization_level, seed, TRANSPILED_LAYOUT_VERSION)
+            for profile in dict.fromkeys(profiles)
+        }
+        transpiled = {profile: cache.get(key) for profile, key in keys.items()}
+
+        futures = {
+            profile: submit(_transpile_for_profile, circuit, profile, optimization_level, seed)
+            for profile, cached in transpiled.items() if cached is None
+        }
+
+        for profile, future in futures.items():
+            transpiled[profile] = future.result()
+            cache.set(keys[profile], transpiled[profile])
+
+        return transpiled
+
+    def execute(self, circuit, shots: int, seed: int, noise_model: Optional["NoiseModel"] = None, **run_options) -> Execution:
+        """Run the circuit and return the per-shot statevectors saved at every step together with the final counts."""
+        result = self.simulator.run(circuit, shots=shots, seed_simulator=seed, noise_model=noise_model, **run_options).result()
+
+        return Execution(self._saved_statevectors(circuit, result.data(0)), result.get_counts(0), shots)
+
+    @staticmethod
+    def _saved_statevectors(circuit, data: dict) -> dict:
+        statevectors = {name: value for name, value in natsorted(data.items()) if name.startswith('sv')}
+
+        # Routing of a transpiled circuit leaves its qubits permuted, the final state is put back in the written order
+        permutation = (circuit.metadata or {}).get('final_permutation')
+        if permutation and statevectors:
+            final_step = list(statevectors)[-1]
+            statevectors[final_step] = restore_final_layout(statevectors[final_step], permutation)
+
+        return statevectors
+
+    def execute_sharded(self, circuit, shots: int, seed: int, noise_model: Optional["NoiseModel"], shards: int) -> Execution:
+        """
+        Split the shots into shards that run on the process pool, each with a seed derived from the given seed.
+
+        Shards are merged in order, so the same seed and shard count always produce the same result.
+        """
+        shards = max(min(shards, shots), 1)
+
+        if shards == 1:
+            return self.execute(circuit, shots, seed, noise_model)
+
+        # Spread the remainder over the first shards
+        shard_shots = [shots // shards + (index < shots % shards) for index in range(shards)]
+
+        # Every shard gets a single Aer thread, the parallelism comes from the process pool instead
+        futures = [
+            submit(_execute_shard, circuit, count, shard_seed, noise_model)
+            for count, shard_seed in zip(shard_shots, spawn_seeds(seed, shards))
+        ]
+
+        return merge_executions([future.result() for future in futures])
+
+    def execute_bound(self, circuit, shots: int, seed: int, noise_model: Optional["NoiseModel"], values: dict) -> list[Execution]:
+        """
+        Run every binding of the circuit's parameters in a single Aer job.
+
+        The values map each Parameter to its value per binding, one execution is returned per binding in the same order.
+        """
+        num_bindings = len(next(iter(values.values())))
+        result = self.simulator.run(circuit, shots=shots, seed_simulator=seed, noise_model=noise_model, parameter_binds=[values]).result()
+
+        return [
+            Execution(
+                self._saved_statevectors(circuit, result.data(index)),
+                result.get_counts(index),
+                shots,
+            )
+            for index in range(num_bindings)
+        ]
+
+    def _execute_streaming(self, circuit, shots: int, seed: int, noise_model: "NoiseModel",
+                           options: SimulationOptions) -> tuple[Execution, Execution, TrajectoryAggregates]:
+        """
+        Execute the shots in batches, folding every batch into per-step statistics right away.
+
+        Only a uniform reservoir sample of options.stored_trajectories trajectories is kept, so memory is bounded by the batch
+        size and the stored trajectories instead of growing with the shots.
+        """
+        rng = np.random.default_rng(seed)
+        batch_seeds = seed_stream(seed)
+        stored = options.stored_trajectories
+
+        # (shot index, ideal statevector per step, noisy statevector per step)
+        reservoir = []
+        fidelity_sums = 0
+        step_counts = {'ideal': {}, 'noisy': {}}
+        counts = {'ideal': Counter(), 'noisy': Counter()}
+        observable_sums = {}
+        seen = 0
+
+        while seen < shots:
+            batch_shots = min(options.batch_shots, shots - seen)
+            batch_seed = next(batch_seeds)
+
+            # Both branches of a batch share the seed, so their shots stay paired
+            batch = {'ideal': self.execute_sharded(circuit, batch_shots, batch_seed, None, options.shards)}
+            batch['noisy'] = batch['ideal'] if noise_model is None else \
+                self.execute_sharded(circuit, batch_shots, batch_seed, noise_model, options.shards)
+            names = list(batch['ideal'].statevectors)
+
+            fidelity_sums = fidelity_sums + np.array([
+                np.sum(compute_batched_fidelity([sv.data for sv in batch['ideal'].statevectors[name]],
+                                                [sv.data for sv in batch['noisy'].statevectors[name]]))
+                for name in names
+            ])
+
+            for branch, execution in batch.items():
+                counts[branch].update(execution.counts)
+
+                for name, batch_counts in self._sample_step_counts(execution, batch_seed).items():
+                    step_counts[branch][name] = step_counts[branch].get(name, 0) + batch_counts
+
+                if options.observables:
+                    values = compute_observable_values(execution, options.observables)
+                    total, total_squares = observable_sums.get(branch, (0, 0))
+                    observable_sums[branch] = (total + values.sum(axis=1), total_squares + (values ** 2).sum(axis=1))
+
+            # Reservoir sampling keeps every shot seen so far with the same probability
+            for offset in range(batch_shots):
+                index = seen + offset
+                slot = index if index < stored else rng.integers(0, index + 1)
 
-        num_qubits = circuit.num_qubits
-        num_outcomes = 2 ** num_qubits
-        basis_states = [format(i, f'0{num_qubits}b') for i in range(num_outcomes)]
+                if slot < stored:
+                    trajectory = (
+                        index,
+                        [batch['ideal'].statevectors[name][offset] for name in names],
+                        [batch['noisy'].statevectors[name][offset] for name in names],
+                    )
+
+                    if slot == len(reservoir):
+                        reservoir.append(trajectory)
+                    else:
+                        reservoir[slot] = trajectory
+
+            seen += batch_shots
+
+        reservoir.sort(key=lambda trajectory: trajectory[0])
+
+        def stored_execution(position: int, branch: str) -> Execution:
+            statevectors = {name: [trajectory[position][step] for trajectory in reservoir] for step, name in enumerate(names)}
+
+            return Execution(statevectors, dict(counts[branch]), shots)
+
+        aggregates = TrajectoryAggregates(
+            fidelity=[float(total / shots) for total in fidelity_sums],
+            ideal_step_counts=step_counts['ideal'],
+            noisy_step_counts=step_counts['noisy'],
+            observables={
+                branch: summarize_observable_sums(list(options.observables), total, total_squares, shots)
+                for branch, (total, total_squares) in observable_sums.items()
+            } if options.observables else None,
+        )
+
+        return stored_execution(1, 'ideal'), stored_execution(2, 'noisy'), aggregates
+
+    def _execute_adaptive(self, circuit, max_shots: int, seed: int, noise_model: "NoiseModel", options: SimulationOptions):
+        """
+        Execute the circuit in batches of shots until the estimates are precise enough or the budget runs out.
+
+        The estimates are the probability of every final measurement outcome and the mean fidelity of the final noisy state,
+        both are considered precise once their standard error is below the target.
+        """
+        started = time.perf_counter()
+        batch_seeds = seed_stream(seed)
+
+        ideal = noisy = None
+        batches = 0
+
+        while True:
+            batch_seed = next(batch_seeds)
+            batch_shots = min(options.batch_shots, max_shots - (noisy.shots if noisy else 0))
+            batches += 1
+
+            ideal_batch = self.execute_sharded(circuit, batch_shots, batch_seed, None, options.shards)
+            noisy_batch = ideal_batch if noise_model is None else self.execute_sharded(circuit, batch_shots, batch_seed, noise_model, options.shards)
+
+            ideal = merge_executions([ideal, ideal_batch])
+            noisy = merge_executions([noisy, noisy_batch])
+
+            # Standard error of the estimated probability of every outcome, for a multinomial sample
+            probabilities = np.array(list(noisy.counts.values())) / noisy.shots
+            probability_error = float(np.max(np.sqrt(probabilities * (1 - probabilities) / noisy.shots)))
+
+            final_step = list(noisy.statevectors.keys())[-1]
+            fidelities = compute_batched_fidelity(
+                [sv.data for sv in ideal.statevectors[final_step]],
+                [sv.data for sv in noisy.statevectors[final_step]]
+            )
+            fidelity_error = float(np.std(fidelities, ddof=1) / np.sqrt(noisy.shots)) if noisy.shots > 1 else float('inf')
+
+            if max(probability_error, fidelity_error) <= options.target_standard_error:
+                stop_reason = "precision"
+            elif noisy.shots >= max_shots:
+                stop_reason = "shot_budget"
+            elif options.time_budget is not None and time.perf_counter() - started >= options.time_budget:
+                stop_reason = "time_budget"
+            else:
+                continue
+
+            summary = AdaptiveShotSummary(
+                shots=noisy.shots,
+                batches=batches,
+                probability_standard_error=probability_error,
+                fidelity_standard_error=fidelity_error,
+                stop_reason=stop_reason,
+            )
+
+            return ideal, noisy, summary
+
+    def simulate(self, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str, noise_params: Optional[dict] = None,
+                 options: Optional[SimulationOptions] = None) -> SimulationResult:
+        options = options or SimulationOptions()
+
+        # Runs with an explicit seed are deterministic, so their results can be shared between workers
+        if seed is not None and options.cache_results and options.time_budget is None:
+            return get_or_compute(
+                "results",
+                self.result_cache_key(qasm_str, shots, seed, noise_profile_name, noise_params, options),
+                lambda: self.simulate(qasm_str, shots, seed, noise_profile_name, noise_params, replace(options, cache_results=False))
+            )
 
         # Ensure that seed is the same for both simulator runs
         if seed is None:
             seed = random.randint(1, 99999)
 
-        # Apply noise model based on the provided input
-        if noise_profile_name and noise_profile_name != 'custom':
-            # Load noise model from a specific backend (quantum computer) using its profile name
-            backend = self.load_backend(noise_profile_name)
-            noise_model = NoiseModel.from_backend(backend)
-        elif noise_params and noise_profile_name == 'custom':
-            # If noise params are provided, create a custom noise model
-            noise_model = self.create_noise_model(noise_params)
+        # Refuse or downgrade runs that would not fit in memory before doing any work, repetitions on the pool run concurrently
+        options, cost = self.fit_to_budget(qasm_str, shots, options, runs=self.concurrent_repetitions(options))
+
+        if options.repetitions > 1:
+            return self._simulate_repetitions(qasm_str, shots, seed, noise_profile_name, noise_params, options)
+
+        # Loaded
+        circuit = self.load_circuit(qasm_str)
+
+        if options.transpile and noise_profile_name in self.profile_backends:
+            # Run on the device's basis gates and coupling map, so the device noise applies to the gates that actually run
+            with span("transpile"):
+                transpiled = self.transpile_for_profiles(qasm_str, circuit, [noise_profile_name], options.optimization_level, options.transpile_seed)
+            circuit, noise_model = transpiled[noise_profile_name].circuit, transpiled[noise_profile_name].noise_model
+        else:
+            with span("noise_model_build"):
+                noise_model = self.resolve_noise_model(noise_profile_name, noise_params)
+
+        # Parameters are bound after transpiling, so the cached transpilation is shared by all parameter values
+        circuit = bind_parameters(circuit, options.parameters)
+
+        # Readout errors are applied exactly afterwards, a model without any other noise then needs no noisy run at all
+        confusion = None
+        if options.analytic_readout:
+            noise_model, confusion = split_readout_errors(noise_model, circuit.num_qubits)
+
+        if noise_model.is_ideal():
+            noise_model = None
+
+        clbit_qubits = measured_qubits(circuit)
+
+        with span("snapshot_insertion"):
+            operations = self._step_operations(circuit, options.snapshot_stride)
+            circuit = insert_save_statevectors(circuit, stride=options.snapshot_stride)
+
+        basis_states = self._basis_states(circuit.num_qubits)
+
+        logger.info("Executing simulation with seed %s and noise model %s", seed, noise_model)
+
+        if options.adaptive:
+            # The requested shots act as the budget for the adaptive mode, the ideal and noisy batches are interleaved
+            with span("adaptive_run"):
+                ideal, noisy, adaptive = self._execute_adaptive(circuit, shots, seed, noise_model, options)
+            aggregates = None
+        elif options.stored_trajectories is not None and options.stored_trajectories < shots:
+            # Only a sample of the trajectories is stored, so the shots can be folded into statistics batch by batch
+            with span("streaming_run"):
+                ideal, noisy, aggregates = self._execute_streaming(circuit, shots, seed, noise_model, options)
+            adaptive = None
         else:
-            # If no noise info is provided, use a default (ideal) noise model
-            noise_model = NoiseModel()  # This creates an ideal model (no noise)
+            with span("ideal_run"):
+                ideal = self.execute_sharded(circuit, shots, seed, None, options.shards)
+
+            if noise_model is None:
+                noisy = ideal
+            else:
+                with span("noisy_run"):
+                    noisy = self.execute_sharded(circuit, shots, seed, noise_model, options.shards)
+            adaptive = aggregates = None
+
+        with span("post_processing"):
+            result = self._build_result(basis_states, operations, ideal, noisy, seed, options, adaptive=adaptive, aggregates=aggregates)
+
+            if confusion is not None:
+                self._apply_readout(result, confusion, clbit_qubits, seed)
+        result.cost = cost
+
+        return result
+
+    def simulate_many(self, qasm_str: str, shots: int, seed: Optional[int], profiles: list[str], noise_params: Optional[dict] = None,
+                      options: Optional[SimulationOptions] = None) -> dict[str, SimulationResult]:
+        """
+        Simulate the circuit against several noise profiles, parsing it and running the ideal branch only once.
+
+        The noisy variants run in parallel on the process pool, each running its shards sequentially within its worker.
+        Repetitions and the adaptive mode are not applied here.
+        """
+        options = options or SimulationOptions()
 
-        print(f"Executing simulation with seed {seed} and noise model", noise_model)
+        # All profiles share the same seed and shard split, so their shots are paired with the same ideal trajectories
+        if seed is None:
+            seed = random.randint(1, 99999)
 
-        result_ideal = self.simulator.run(circuit, shots=shots, seed_simulator=seed).result()
-        result_noisy = self.simulator.run(circuit, shots=shots, seed_simulator=seed, noise_model=noise_model).result()
+        profiles = list(dict.fromkeys(profiles))
 
-        result_ideal_svs = {name: data for name, data in natsorted(result_ideal.data(0).items()) if name.startswith('sv')}
-        result_noisy_svs = {name: data for name, data in natsorted(result_noisy.data(0).items()) if name.startswith('sv')}
+        # Every profile holds its executions until all results are built, and all trajectories are run before selecting the stored ones
+        options, cost = self.fit_to_budget(qasm_str, shots, options, runs=len(profiles), streaming=False)
 
-        def process_result(results):
-            processed = {}
+        circuit = self.load_circuit(qasm_str)
 
-            for name, data in results.items():
-                processed[name] = []
+        # Transpiled profiles each run their own circuit, so they cannot share the ideal branch
+        transpiled = {}
+        if options.transpile:
+            device_profiles = [profile for profile in profiles if profile in self.profile_backends]
+            transpiled = self.transpile_for_profiles(qasm_str, circuit, device_profiles, options.optimization_level, options.transpile_seed)
 
-                for sv in data:
-                    sv.seed(seed)
-                    sample_counts = sv.sample_counts(shots)
+        transpiled_futures = {
+            profile: submit(_execute_pair, insert_save_statevectors(bind_parameters(transpiled[profile].circuit, options.parameters),
+                                                                    stride=options.snapshot_stride), shots, seed, transpiled[profile].noise_model,
+                            options.shards)
+            for profile in transpiled
+        }
+
+        circuit = bind_parameters(circuit, options.parameters)
+        operations = self._step_operations(circuit, options.snapshot_stride)
+        circuit = insert_save_statevectors(circuit, stride=options.snapshot_stride)
+        basis_states = self._basis_states(circuit.num_qubits)
+
+        futures = {
+            profile: submit(_execute_profile, circuit, shots, seed, profile, noise_params, options.shards)
+            for profile in profiles if profile not in transpiled
+        }
 
-                    counts = np.array([sample_counts.get(key, 0) for key in basis_states])
-                    probabilities = sv.probabilities() * 100
+        results = {}
 
-                    processed[name].append(StatevectorResult(serialize_complex_array(sv.data), counts, probabilities))
+        if futures:
+            ideal = self.execute_sharded(circuit, shots, seed, None, options.shards)
+            indices = self._stored_trajectory_indices(ideal.shots, seed, options)
+            stored_ideal = select_trajectories(ideal, indices) if indices is not None else ideal
+            processed_ideal = self._process_statevectors(stored_ideal, basis_states, seed, options.store_statevectors, options.per_shot_counts)
 
-            return processed
+            for profile, future in futures.items():
+                results[profile] = self._build_result(basis_states, operations, ideal, future.result(), seed, options,
+                                                      processed_ideal=processed_ideal)
+
+        for profile, future in transpiled_futures.items():
+            transpiled_circuit = transpiled[profile].circuit
+            ideal, noisy = future.result()
+
+            results[profile] = self._build_result(
+                self._basis_states(transpiled_circuit.num_qubits), self._step_operations(transpiled_circuit, options.snapshot_stride), ideal, noisy, seed,
+                options
+            )
+
+        for result in results.values():
+            result.cost = cost
+
+        return {profile: results[profile] for profile in profiles}
+
+    def sweep(self, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str, noise_params: Optional[dict],
+              parameter_values: dict[str, list[float]], options: Optional[SimulationOptions] = None) -> SweepResult:
+        """
+        Run the circuit for every point of a parameter sweep, with all points of a branch batched into one Aer job.
+
+        The circuit is parsed, transpiled and its noise model built once. Only the final state is saved per point, snapshot
+        and repetition options do not apply.
+        """
+        options = options or SimulationOptions()
+
+        if seed is None:
+            seed = random.randint(1, 99999)
+
+        num_points = {len(values) for values in parameter_values.values()}
+        if len(num_points) != 1 or 0 in num_points:
+            raise ValueError("Every swept parameter needs the same, non-zero number of values")
+
+        circuit = self.load_circuit(qasm_str)
+
+        if options.transpile and noise_profile_name in self.profile_backends:
+            transpiled = self.transpile_for_profiles(qasm_str, circuit, [noise_profile_name], options.optimization_level, options.transpile_seed)
+            circuit, noise_model = transpiled[noise_profile_name].circuit, transpiled[noise_profile_name].noise_model
+        else:
+            noise_model = self.resolve_noise_model(noise_profile_name, noise_params)
+
+        parameters = {parameter.name: parameter for parameter in circuit.parameters}
+        if set(parameters) != set(parameter_values):
+            raise ValueError(f"Sweep values must be given for exactly the circuit parameters: {', '.join(sorted(parameters))}")
+
+        # Every point stores its initial and final state, which is what the budget is checked against
+        num_points = num_points.pop()
+        cost = estimate_statevector_cost(circuit.num_qubits, len(circuit.data), shots * num_points, max(len(circuit.data), 1),
+                                         options.store_statevectors)
+        if options.memory_budget is not None and cost.memory_bytes > options.memory_budget:
+            raise SimulationBudgetError(cost, options.memory_budget)
+
+        circuit = insert_save_statevectors(circuit, stride=max(len(circuit.data), 1))
+        values = {parameters[name]: [float(value) for value in parameter_values[name]] for name in parameters}
+
+        ideal = self.execute_bound(circuit, shots, seed, None, values)
+        noisy = self.execute_bound(circuit, shots, seed, noise_model, values)
+
+        basis_states = self._basis_states(circuit.num_qubits)
+        final_step = list(ideal[0].statevectors)[-1]
+
+        fidelity = np.array([
+            np.mean(compute_batched_fidelity([sv.data for sv in ideal_point.statevectors[final_step]],
+                                             [sv.data for sv in noisy_point.statevectors[final_step]]))
+            for ideal_point, noisy_point in zip(ideal, noisy)
+        ])
+
+        def final_observables(executions: list[Execution]) -> ObservableEstimates:
+            estimates = [compute_observable_estimates(execution, options.observables) for execution in executions]
+
+            return ObservableEstimates(
+                names=estimates[0].names,
+                mean=np.array([estimate.mean[-1] for estimate in estimates]),
+                std=np.array([estimate.std[-1] for estimate in estimates]),
+                standard_error=np.array([estimate.standard_error[-1] for estimate in estimates]),
+            )
+
+        return SweepResult(
+            parameters={name: [float(value) for value in parameter_values[name]] for name in parameters},
+            basis_states=basis_states,
+            ideal_counts=np.array([[point.counts.get(state, 0) for state in basis_states] for point in ideal]),
+            noisy_counts=np.array([[point.counts.get(state, 0) for state in basis_states] for point in noisy]),
+            fidelity=fidelity,
+            shots=shots,
+            observables={
+                'ideal': final_observables(ideal),
+                'noisy': final_observables(noisy),
+            } if options.observables else None,
+            cost=cost,
+        )
+
+    def sensitivity(self, qasm_str: str, shots: int, seed: Optional[int], noise_params: dict,
+                    options: Optional[SimulationOptions] = None) -> SensitivityResult:
+        """
+        Attribute the infidelity and outcome distance of a custom noise model to the gates it applies noise to.
+
+        Every noisy gate is run once with its noise removed and once doubled. All variants run in parallel on the process
+        pool against one shared ideal run, with the same seed so their shots stay paired. Only the final state is saved,
+        snapshot, repetition and adaptive options do not apply.
+        """
+        options = options or SimulationOptions()
+
+        if seed is None:
+            seed = random.randint(1, 99999)
+
+        noisy_gates = [gate_ref for gate_ref, gate_params in (noise_params or {}).items() if has_gate_noise(gate_params)]
+        variants = {(None, 1): noise_params or {}}
+        for gate_ref in noisy_gates:
+            variants[(gate_ref, 0)] = scale_gate_noise(noise_params, gate_ref, 0)
+            variants[(gate_ref, 2)] = scale_gate_noise(noise_params, gate_ref, 2)
+
+        circuit = bind_parameters(self.load_circuit(qasm_str), options.parameters)
+
+        # Every variant and the ideal run store their initial and final state, which is what the budget is checked against
+        cost = estimate_statevector_cost(circuit.num_qubits, len(circuit.data), shots * (len(variants) + 1), max(len(circuit.data), 1),
+                                         options.store_statevectors)
+        if options.memory_budget is not None and cost.memory_bytes > options.memory_budget:
+            raise SimulationBudgetError(cost, options.memory_budget)
+
+        circuit = insert_save_statevectors(circuit, stride=max(len(circuit.data), 1))
+
+        # The ideal run goes through the pool as well, so Aer never runs in the calling process before the pool has started
+        ideal = submit(_execute_circuit, circuit, shots, seed).result()
+        ideal_states = np.array([sv.data for sv in ideal.statevectors[list(ideal.statevectors)[-1]]])
+        ideal_probabilities = np.mean(np.abs(ideal_states) ** 2, axis=0)
+
+        futures = {
+            variant: submit(_execute_sensitivity_variant, circuit, shots, seed, variant_params, ideal_states)
+            for variant, variant_params in variants.items()
+        }
+
+        infidelity, tvd = {}, {}
+        for variant, future in futures.items():
+            infidelity[variant], probabilities = future.result()
+            # Total variation distance between the exact outcome distributions, including readout error
+            tvd[variant] = 0.5 * float(np.sum(np.abs(probabilities - ideal_probabilities)))
+
+        baseline = (None, 1)
+        gates = [
+            GateSensitivity(
+                gate=gate_ref,
+                infidelity_removed=infidelity[(gate_ref, 0)],
+                infidelity_doubled=infidelity[(gate_ref, 2)],
+                tvd_removed=tvd[(gate_ref, 0)],
+                tvd_doubled=tvd[(gate_ref, 2)],
+                infidelity_contribution=infidelity[baseline] - infidelity[(gate_ref, 0)],
+                tvd_contribution=tvd[baseline] - tvd[(gate_ref, 0)],
+            )
+            for gate_ref in noisy_gates
+        ]
+
+        return SensitivityResult(
+            baseline_infidelity=infidelity[baseline],
+            baseline_tvd=tvd[baseline],
+            gates=sorted(gates, key=lambda gate: (gate.infidelity_contribution, gate.tvd_contribution), reverse=True),
+            shots=shots,
+        )
+
+    @staticmethod
+    def _step_operations(circuit, stride: int = 1) -> list[str]:
+        """Return the last operation executed before every saved step, starting with the initialization step."""
+        return ["init"] + [circuit.data[index - 1].operation.name for index in snapshot_steps(len(circuit.data), stride)[1:]]
+
+    @staticmethod
+    def _basis_states(num_qubits: int) -> list[str]:
+        return [format(i, f'0{num_qubits}b') for i in range(2 ** num_qubits)]
+
+    @staticmethod
+    def _process_statevectors(execution: Execution, basis_states: list[str], seed: int, store_statevectors: bool = True,
+                              per_shot_counts: bool = False) -> dict[str, list[StatevectorResult]]:
+        rng = np.random.default_rng(seed)
+        processed = {}
+
+        for name, data in execution.statevectors.items():
+            # Outcome distribution of every trajectory at this step, as (shots, 2^n)
+            probabilities = np.abs(np.array([sv.data for sv in data])) ** 2
+
+            # Histograms of repeatedly measuring a single trajectory are only drawn on request, one multinomial per shot
+            # instead of sampling every trajectory `shots` times
+            counts = rng.multinomial(execution.shots, probabilities / probabilities.sum(axis=-1, keepdims=True)) \
+                if per_shot_counts else [None] * len(data)
+
+            processed[name] = [
+                # Serializing the amplitudes dominates the payload, so they can be left out
+                StatevectorResult(serialize_complex_array(sv.data) if store_statevectors else [], shot_counts, shot_probabilities * 100)
+                for sv, shot_counts, shot_probabilities in zip(data, counts, probabilities)
+            ]
+
+        return processed
+
+    @staticmethod
+    def _sample_step_counts(execution: Execution, seed: int) -> dict[str, np.ndarray]:
+        """Measure every trajectory once at every step, which gives the counts the shot ensemble produces at that step."""
+        rng = np.random.default_rng(seed)
+        step_counts = {}
+
+        for name, data in execution.statevectors.items():
+            probabilities = np.abs(np.array([sv.data for sv in data])) ** 2
+            cumulative = np.cumsum(probabilities / probabilities.sum(axis=-1, keepdims=True), axis=-1)
+
+            # Inverse transform sampling of one outcome per trajectory, clipped against rounding in the last bin
+            outcomes = np.minimum(np.sum(cumulative < rng.random((len(data), 1)), axis=-1), probabilities.shape[-1] - 1)
+            step_counts[name] = np.bincount(outcomes, minlength=probabilities.shape[-1])
+
+        return step_counts
+
+    @staticmethod
+    def _apply_readout(result: SimulationResult, confusion: np.ndarray, clbit_qubits: dict[int, int], seed: int):
+        """Pass the noisy measurements through the readout channel and add the exact distributions including readout error."""
+        rng = np.random.default_rng(seed)
+
+        result.noisy_counts = apply_readout_to_counts(result.noisy_counts, confusion, clbit_qubits, rng)
+        result.noisy_step_counts = {name: apply_readout_to_histogram(counts, confusion, rng) for name, counts in result.noisy_step_counts.items()}
+        result.readout_probabilities = {
+            name: apply_readout_confusion(np.mean([sv.probabilities for sv in svs], axis=0) / 100, confusion)
+            for name, svs in result.noisy.items()
+        }
+
+    def _aggregate_trajectories(self, ideal: Execution, noisy: Execution, seed: int, options: SimulationOptions) -> TrajectoryAggregates:
+        """Compute the statistics over all shots that do not depend on which trajectories are stored."""
+        return TrajectoryAggregates(
+            # Mean fidelity between the ideal and noisy trajectory of every shot, for each step
+            fidelity=[
+                float(np.mean(compute_batched_fidelity([sv.data for sv in ideal.statevectors[name]], [sv.data for sv in noisy.statevectors[name]])))
+                for name in ideal.statevectors
+            ],
+            ideal_step_counts=self._sample_step_counts(ideal, seed),
+            noisy_step_counts=self._sample_step_counts(noisy, seed),
+            observables={
+                'ideal': compute_observable_estimates(ideal, options.observables),
+                'noisy': compute_observable_estimates(noisy, options.observables),
+            } if options.observables else None,
+        )
+
+    @staticmethod
+    def _stored_trajectory_indices(shots: int, seed: int, options: SimulationOptions) -> Optional[np.ndarray]:
+        """Return the uniformly sampled shots whose trajectories are stored, or None when every trajectory is kept."""
+        if options.stored_trajectories is None or options.stored_trajectories >= shots:
+            return None
+
+        return np.sort(np.random.default_rng(seed).choice(shots, options.stored_trajectories, replace=False))
+
+    def _build_result(self, basis_states: list[str], operations: list[str], ideal: Execution, noisy: Execution, seed: int,
+                      options: SimulationOptions, processed_ideal: Optional[dict[str, list[StatevectorResult]]] = None,
+                      adaptive: Optional[AdaptiveShotSummary] = None, aggregates: Optional[TrajectoryAggregates] = None) -> SimulationResult:
+        # Streamed executions arrive with their aggregates and only the stored trajectories
+        if aggregates is None:
+            aggregates = self._aggregate_trajectories(ideal, noisy, seed, options)
+
+            indices = self._stored_trajectory_indices(noisy.shots, seed, options)
+            if indices is not None:
+                ideal, noisy = select_trajectories(ideal, indices), select_trajectories(noisy, indices)
 
         return SimulationResult(
             basis_states,
-            process_result(result_ideal_svs),
-            process_result(result_noisy_svs),
-            result_ideal.get_counts(0),
-            result_noisy.get_counts(0)
+            processed_ideal or self._process_statevectors(ideal, basis_states, seed, options.store_statevectors, options.per_shot_counts),
+            self._process_statevectors(noisy, basis_states, seed, options.store_statevectors, options.per_shot_counts),
+            ideal.counts,
+            noisy.counts,
+            ideal_step_counts=aggregates.ideal_step_counts,
+            noisy_step_counts=aggregates.noisy_step_counts,
+            fidelity=aggregates.fidelity,
+            operations=operations,
+            shots=noisy.shots,
+            adaptive=adaptive,
+            diagnostics={
+                'ideal': compute_state_diagnostics(ideal),
+                'noisy': compute_state_diagnostics(noisy),
+            } if options.diagnostics else None,
+            observables=aggregates.observables,
+        )
+
+    def _simulate_repetitions(self, qasm_str: str, shots: int, seed: int, noise_profile_name: str, noise_params: Optional[dict],
+                              options: SimulationOptions) -> SimulationResult:
+        """Run independent seeds spawned from the master seed in parallel and aggregate them into confidence intervals."""
+        seeds = spawn_seeds(seed, options.repetitions)
+        single_options = replace(options, repetitions=1)
+        clbit_qubits = measured_qubits(self.load_circuit(qasm_str))
+
+        # The remaining repetitions run on the process pool while the first one, whose full result is returned, runs here.
+        # Only their summaries are kept, so they skip the diagnostics
+        futures = [
+            submit(_simulate_repetition_summary, qasm_str, shots, repetition_seed, noise_profile_name, noise_params,
+                   replace(single_options, diagnostics=False), clbit_qubits)
+            for repetition_seed in seeds[1:]
+        ]
+
+        result = self.simulate(qasm_str, shots, seeds[0], noise_profile_name, noise_params, single_options)
+        summaries = [summarize_repetition(result, clbit_qubits)] + [future.result() for future in futures]
+
+        def estimate(samples):
+            return IntervalEstimate(*mean_confidence_interval(samples, options.confidence))
+
+        fidelities, ideal_counts, noisy_counts = zip(*summaries)
+        # Counts of circuits that leave qubits unmeasured cannot be arranged by basis state
+        mapped = all(counts is not None for counts in ideal_counts + noisy_counts)
+
+        result.statistics = RepetitionStatistics(
+            repetitions=options.repetitions,
+            confidence=options.confidence,
+            seeds=seeds,
+            fidelity=estimate(fidelities),
+            ideal_counts=estimate(ideal_counts) if mapped else None,
+            noisy_counts=estimate(noisy_counts) if mapped else None,
         )
 
+        return result
+
     def supported_operations(self):
         return {
             "id": Gate(
@@ -206,6 +893,14 @@ class QiskitSimulator(BaseSimulator):
                                         NoiseParameterType.THERMAL_RELAXATION],
                 num_qubits=1
             ),
+            "sx": Gate(
+                short_name="SX",
+                long_name="SX (√X)",
+                description="Square root of the Pauli-X gate, native to IBM devices",
+                supported_noise_params=[NoiseParameterType.BIT_FLIP, NoiseParameterType.PHASE_FLIP, NoiseParameterType.PHASE_DAMPING,
+                                        NoiseParameterType.DEPOLARIZING, NoiseParameterType.THERMAL_RELAXATION],
+                num_qubits=1
+            ),
             "y": Gate(
                 short_name="Y",
                 long_name="Y (Pauli-Y)",
@@ -292,6 +987,13 @@ class QiskitSimulator(BaseSimulator):
                 supported_noise_params=[NoiseParameterType.DEPOLARIZING],
                 num_qubits=2
             ),
+            "ecr": Gate(
+                short_name="ECR",
+                long_name="ECR (Echoed Cross-Resonance)",
+                description="Entangling gate native to IBM Eagle devices",
+                supported_noise_params=[NoiseParameterType.DEPOLARIZING],
+                num_qubits=2
+            ),
             "cz": Gate(
                 short_name="CZ",
                 long_name="CZ (Controlled-Z)",
@@ -376,3 +1078,86 @@ class QiskitSimulator(BaseSimulator):
         ]
 
         return used_gates
+
+
+def summarize_repetition(result: SimulationResult, clbit_qubits: dict[int, int]):
+    """
+    Reduce a result to the per-step fidelity and final counts vectors that are aggregated across repetitions.
+
+    The counts are keyed by classical bits and are arranged by the qubit basis states they were measured from, they are
+    None when that is not possible.
+    """
+    num_qubits = len(result.basis_states[0])
+
+    return (
+        np.asarray(result.fidelity),
+        counts_to_basis_vector(result.ideal_counts, num_qubits, clbit_qubits),
+        counts_to_basis_vector(result.noisy_counts, num_qubits, clbit_qubits),
+    )
+
+
+_worker_simulator: Optional[QiskitSimulator] = None
+
+
+def _get_worker_simulator() -> QiskitSimulator:
+    # Reuse a single simulator per worker process, so the Aer simulator is only constructed once
+    global _worker_simulator
+
+    if _worker_simulator is None:
+        _worker_simulator = QiskitSimulator()
+
+    return _worker_simulator
+
+
+def _execute_circuit(circuit, shots: int, seed: int, noise_model: Optional["NoiseModel"] = None) -> Execution:
+    return _get_worker_simulator().execute(circuit, shots, seed, noise_model)
+
+
+def _execute_shard(circuit, shots: int, seed: int, noise_model: Optional["NoiseModel"]) -> Execution:
+    return _get_worker_simulator().execute(circuit, shots, seed, noise_model, max_parallel_threads=1)
+
+
+def _execute_profile(circuit, shots: int, seed: int, noise_profile_name: str, noise_params: Optional[dict], shards: int) -> Execution:
+    # Runs in a worker process. The shards run one after another here, with the same shot split and derived seeds as the
+    # ideal run in the parent, so every noisy shot stays paired with its ideal shot
+    set_default_workers(1)
+    simulator = _get_worker_simulator()
+
+    return simulator.execute_sharded(circuit, shots, seed, simulator.resolve_noise_model(noise_profile_name, noise_params), shards)
+
+
+def _execute_pair(circuit, shots: int, seed: int, noise_model: "NoiseModel", shards: int) -> tuple[Execution, Execution]:
+    set_default_workers(1)
+    simulator = _get_worker_simulator()
+
+    return simulator.execute_sharded(circuit, shots, seed, None, shards), simulator.execute_sharded(circuit, shots, seed, noise_model, shards)
+
+
+def _execute_sensitivity_variant(circuit, shots: int, seed: int, noise_params: dict, ideal_states: np.ndarray) -> tuple[float, np.ndarray]:
+    # Runs in a worker process, only the infidelity and the final outcome distribution are sent back to the parent
+    simulator = _get_worker_simulator()
+    noise_model, confusion = split_readout_errors(simulator.create_noise_model(noise_params), circuit.num_qubits)
+
+    execution = simulator.execute(circuit, shots, seed, None if noise_model.is_ideal() else noise_model)
+    states = np.array([sv.data for sv in execution.statevectors[list(execution.statevectors)[-1]]])
+
+    probabilities = np.mean(np.abs(states) ** 2, axis=0)
+    if confusion is not None:
+        probabilities = apply_readout_confusion(probabilities, confusion)
+
+    return 1 - float(np.mean(compute_batched_fidelity(ideal_states, states))), probabilities
+
+
+def _transpile_for_profile(circuit, profile: str, optimization_level: int, seed: int) -> TranspiledCircuit:
+    return transpile_for_backend(circuit, _get_worker_simulator().load_backend(profile), optimization_level, seed)
+
+
+def _simulate_repetition_summary(qasm_str: str, shots: int, seed: int, noise_profile_name: str, noise_params: Optional[dict],
+                                 options: SimulationOptions, clbit_qubits: dict[int, int]):
+    # Runs in a worker process, only the small summary is sent back to the parent. Every repetition already has its own
+    # worker, so shards and transpilation must not fan out to the pool again
+    set_default_workers(1)
+
+    result = _get_worker_simulator().simulate(qasm_str, shots, seed, noise_profile_name, noise_params, options)
+
+    return summarize_repetition(result, clbit_qubits)
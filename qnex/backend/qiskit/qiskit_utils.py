@@ -1,12 +1,491 @@
-from qiskit import QuantumCircuit
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
 
+import numpy as np
+
+from qnex.backend.types import CostEstimate, StateDiagnostics, ObservableEstimates, NoiseParameterType
+from qnex.utils.quantum import compute_reduced_density_matrices, density_matrices_to_bloch_vectors, compute_purities, \
+    compute_qubit_entropies, compute_bipartite_entropies, compute_pauli_expectations, apply_readout_flips
+
+# Rough per-amplitude costs used to estimate the footprint of a run, measured on the statevector method
+BYTES_PER_AMPLITUDE = 16
+# Statevector objects, the serialized (re, im) tuples, probabilities and counts held in memory while processing
+PROCESSING_BYTES_PER_AMPLITUDE = 150
+# Share of the processing memory taken by the serialized (re, im) tuples, which are skipped when statevectors are not stored
+STATEVECTOR_PROCESSING_BYTES_PER_AMPLITUDE = 110
+# JSON encoded (re, im) pair, probability and count, of which the (re, im) pair takes the largest share
+PAYLOAD_BYTES_PER_AMPLITUDE = 70
+STATEVECTOR_PAYLOAD_BYTES_PER_AMPLITUDE = 45
+SECONDS_PER_AMPLITUDE_GATE = 2e-9
+SECONDS_PER_PROCESSED_AMPLITUDE = 4e-7
+SECONDS_PER_SAMPLE = 1e-7
+
+# Part of the transpilation cache key, bumped whenever the qubit order of compacted circuits changes
+TRANSPILED_LAYOUT_VERSION = 2
+
+# Version header after any leading whitespace and comments, "OPENQASM 3;" and "OPENQASM 3.0;" are both valid
+QASM_VERSION_PATTERN = re.compile(r"\A(?:\s+|//[^\n]*|/\*.*?\*/)*OPENQASM\s+(\d+)(?:\.\d+)?\s*;", re.DOTALL)
+
+if TYPE_CHECKING:
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+    from qiskit_aer.noise import NoiseModel
+
+
+@dataclass
+class Execution:
+    # Per-shot statevectors saved at every step, in natural step order
+    statevectors: dict[str, list["Statevector"]]
+    counts: dict[str, int]
+    shots: int
+
+
+@dataclass
+class TrajectoryAggregates:
+    # Statistics over all shots, which stay valid when only some trajectories are stored
+    fidelity: list[float]
+    ideal_step_counts: dict[str, np.ndarray]
+    noisy_step_counts: dict[str, np.ndarray]
+    observables: Optional[dict[str, ObservableEstimates]] = None
+
+
+@dataclass
+class TranspiledCircuit:
+    # Transpiled circuit, compacted to the physical qubits it uses
+    circuit: "QuantumCircuit"
+    # Device noise model remapped onto the compacted qubits
+    noise_model: "NoiseModel"
+    physical_qubits: list[int]
+
+
+def snapshot_steps(num_instructions: int, stride: int = 1) -> list[int]:
+    """Return after how many instructions a statevector is saved, the initial and final state are always included."""
+    stride = max(stride, 1)
+
+    return [0] + [index for index in range(1, num_instructions + 1) if index % stride == 0 or index == num_instructions]
+
+
+def insert_save_statevectors(circuit: "QuantumCircuit", prefix='sv', stride: int = 1) -> "QuantumCircuit":
+    # Importing qiskit_aer registers the save instructions on QuantumCircuit
+    import qiskit_aer  # noqa: F401
+
+    steps = set(snapshot_steps(len(circuit.data), stride))
 
-def insert_save_statevectors(circuit: QuantumCircuit, prefix='sv') -> QuantumCircuit:
     debug_circuit = circuit.copy_empty_like()
     debug_circuit.save_statevector(f"{prefix}_{0}", pershot=True)
 
     for index, instruction in enumerate(circuit.data):
         debug_circuit.append(instruction)
-        debug_circuit.save_statevector(f"{prefix}_{index + 1}", pershot=True)
+
+        if index + 1 in steps:
+            debug_circuit.save_statevector(f"{prefix}_{index + 1}", pershot=True)
 
     return debug_circuit
+
+
+def sniff_qasm_version(qasm_str: str) -> int:
+    """Return the major OpenQASM version declared by a program, programs without a header are treated as OpenQASM 2."""
+    match = QASM_VERSION_PATTERN.match(qasm_str)
+
+    return int(match.group(1)) if match else 2
+
+
+def parse_qasm3(qasm_str: str) -> "QuantumCircuit":
+    """
+    Parse an OpenQASM 3 program with Qiskit's native importer, falling back to the reference importer.
+
+    The native importer is orders of magnitude faster on long programs but only covers a subset of the language, the
+    reference importer handles the rest and reports the errors for invalid programs.
+    """
+    from qiskit import qasm3
+
+    loads_experimental = getattr(qasm3, "loads_experimental", None)
+
+    if loads_experimental is not None:
+        try:
+            return loads_experimental(qasm_str)
+        except qasm3.QASM3ImporterError:
+            pass
+
+    return qasm3.loads(qasm_str)
+
+
+def bind_parameters(circuit: "QuantumCircuit", values: Optional[dict[str, float]]) -> "QuantumCircuit":
+    """Assign values to the circuit's input parameters by name, circuits without parameters are returned as they are."""
+    if not circuit.parameters:
+        return circuit
+
+    values = values or {}
+    missing = sorted(parameter.name for parameter in circuit.parameters if parameter.name not in values)
+
+    if missing:
+        raise ValueError(f"Missing values for circuit parameters: {', '.join(missing)}")
+
+    return circuit.assign_parameters({parameter: float(values[parameter.name]) for parameter in circuit.parameters})
+
+
+def merge_executions(executions: list[Optional[Execution]]) -> Execution:
+    """Concatenate the shots of several executions of the same circuit, in the order they are given."""
+    executions = [execution for execution in executions if execution is not None]
+
+    statevectors = {
+        name: [sv for execution in executions for sv in execution.statevectors[name]]
+        for name in executions[0].statevectors
+    }
+
+    counts = Counter()
+    for execution in executions:
+        counts.update(execution.counts)
+
+    return Execution(statevectors, dict(counts), sum(execution.shots for execution in executions))
+
+
+def compute_state_diagnostics(execution: Execution) -> StateDiagnostics:
+    """Compute per-qubit diagnostics for every step and shot, reducing all shots of a step in one batch."""
+    bloch_vectors, purity, entropy, half_cut_entropy = [], [], [], []
+
+    # Steps are processed one at a time, so only a single step's statevectors are copied into an array at once
+    for statevectors in execution.statevectors.values():
+        states = np.array([sv.data for sv in statevectors])
+        num_qubits = int(np.log2(states.shape[-1]))
+
+        rho = compute_reduced_density_matrices(states)
+        vectors = density_matrices_to_bloch_vectors(rho)
+
+        bloch_vectors.append(vectors)
+        purity.append(compute_purities(rho))
+        entropy.append(compute_qubit_entropies(vectors))
+        half_cut_entropy.append(compute_bipartite_entropies(states, num_qubits // 2))
+
+    return StateDiagnostics(
+        bloch_vectors=np.array(bloch_vectors, dtype=np.float32),
+        purity=np.array(purity, dtype=np.float32),
+        entropy=np.array(entropy, dtype=np.float32),
+        half_cut_entropy=np.array(half_cut_entropy, dtype=np.float32),
+    )
+
+
+def compute_observable_values(execution: Execution, observables: dict[str, dict[str, float]]) -> np.ndarray:
+    """Evaluate weighted Pauli sums on every shot's statevector, as (steps, shots, observables)."""
+    values = []
+
+    for statevectors in execution.statevectors.values():
+        states = np.array([sv.data for sv in statevectors])
+
+        # (shots, observables) for this step
+        values.append(np.stack([
+            sum(coefficient * compute_pauli_expectations(states, label) for label, coefficient in terms.items())
+            for terms in observables.values()
+        ], axis=-1))
+
+    return np.array(values)
+
+
+def summarize_observable_sums(names: list[str], total: np.ndarray, total_squares: np.ndarray, count: int) -> ObservableEstimates:
+    """Turn per-step sums and sums of squares over `count` shots into expectation value statistics."""
+    mean = total / count
+    variance = (total_squares - count * mean ** 2) / (count - 1) if count > 1 else np.zeros_like(mean)
+    std = np.sqrt(np.clip(variance, 0, None))
+
+    return ObservableEstimates(
+        names=names,
+        mean=mean,
+        std=std,
+        standard_error=std / np.sqrt(count),
+    )
+
+
+def compute_observable_estimates(execution: Execution, observables: dict[str, dict[str, float]]) -> ObservableEstimates:
+    """Evaluate weighted Pauli sums on every shot's statevector and summarize them across shots for every step."""
+    values = compute_observable_values(execution, observables)
+
+    return summarize_observable_sums(list(observables), values.sum(axis=1), (values ** 2).sum(axis=1), values.shape[1])
+
+
+def select_trajectories(execution: Execution, indices) -> Execution:
+    """Keep the statevectors of the given shots only, the counts and shot number still describe the full execution."""
+    return Execution(
+        {name: [statevectors[index] for index in indices] for name, statevectors in execution.statevectors.items()},
+        execution.counts,
+        execution.shots,
+    )
+
+
+def compact_circuit(circuit: "QuantumCircuit") -> tuple["QuantumCircuit", list[int]]:
+    """
+    Drop the idle qubits of a circuit that was transpiled onto a device.
+
+    Returns the compacted circuit and the physical qubits it kept, in order. Qubits of the original circuit are always kept,
+    even when they are idle, so the compacted circuit is never narrower than the circuit that was transpiled. They come first
+    in their original order, so the initial state is laid out like the circuit that was written. Routing can leave them on
+    other qubits at the end, the permutation that undoes this is stored as the "final_permutation" metadata.
+    """
+    from qiskit import QuantumCircuit, QuantumRegister
+
+    used_qubits = {circuit.find_bit(qubit).index for instruction in circuit.data for qubit in instruction.qubits}
+
+    if circuit.layout is not None:
+        # Physical qubit of every virtual qubit before and after routing
+        initial_layout = circuit.layout.initial_index_layout(filter_ancillas=True)
+        final_layout = circuit.layout.final_index_layout(filter_ancillas=True)
+    else:
+        initial_layout = final_layout = []
+
+    physical_qubits = initial_layout + sorted(used_qubits.difference(initial_layout))
+    index_map = {physical: index for index, physical in enumerate(physical_qubits)}
+
+    compacted = QuantumCircuit(QuantumRegister(len(physical_qubits), 'q'), *circuit.cregs, global_phase=circuit.global_phase,
+                               metadata=dict(circuit.metadata or {}))
+    compacted.add_bits([clbit for clbit in circuit.clbits if not circuit.find_bit(clbit).registers])
+
+    for instruction in circuit.data:
+        qubits = [compacted.qubits[index_map[circuit.find_bit(qubit).index]] for qubit in instruction.qubits]
+        compacted.append(instruction.operation, qubits, instruction.clbits)
+
+    # Compacted qubit every qubit of the final state is taken from, the ancillas fill the remaining positions in order
+    sources = [index_map[physical] for physical in final_layout]
+    permutation = sources + [index for index in range(len(physical_qubits)) if index not in sources]
+
+    if permutation != list(range(len(physical_qubits))):
+        compacted.metadata['final_permutation'] = permutation
+
+    return compacted, physical_qubits
+
+
+def restore_final_layout(statevectors: list["Statevector"], permutation: list[int]) -> list["Statevector"]:
+    """Move every qubit of the given statevectors back to its original position, where qubit i is taken from permutation[i]."""
+    from qiskit.quantum_info import Statevector
+
+    num_qubits = len(permutation)
+    # Axis k of the reshaped amplitudes holds qubit n - 1 - k, as the basis index is little-endian
+    axes = [num_qubits - 1 - permutation[num_qubits - 1 - axis] for axis in range(num_qubits)]
+
+    return [Statevector(np.transpose(sv.data.reshape([2] * num_qubits), axes).reshape(-1)) for sv in statevectors]
+
+
+def remap_noise_model(noise_model: "NoiseModel", physical_qubits: list[int]) -> "NoiseModel":
+    """Restrict a device noise model to the given physical qubits and renumber them from zero."""
+    from qiskit_aer.noise import NoiseModel
+
+    index_map = {physical: index for index, physical in enumerate(physical_qubits)}
+    remapped = NoiseModel(basis_gates=noise_model.basis_gates)
+
+    def remap(qubits):
+        return [index_map[qubit] for qubit in qubits] if all(qubit in index_map for qubit in qubits) else None
+
+    for instruction, errors in noise_model._local_quantum_errors.items():
+        for qubits, error in errors.items():
+            if (mapped := remap(qubits)) is not None:
+                remapped.add_quantum_error(error, instruction, mapped, warnings=False)
+
+    for qubits, error in noise_model._local_readout_errors.items():
+        if (mapped := remap(qubits)) is not None:
+            remapped.add_readout_error(error, mapped, warnings=False)
+
+    for instruction, error in noise_model._default_quantum_errors.items():
+        remapped.add_all_qubit_quantum_error(error, instruction, warnings=False)
+
+    if noise_model._default_readout_error is not None:
+        remapped.add_all_qubit_readout_error(noise_model._default_readout_error, warnings=False)
+
+    return remapped
+
+
+def split_readout_errors(noise_model: "NoiseModel", num_qubits: int) -> tuple["NoiseModel", Optional[np.ndarray]]:
+    """
+    Separate the readout errors from a noise model so they can be applied analytically.
+
+    Returns the model without readout errors and per-qubit (num_qubits, 2, 2) confusion matrices, P(measured | prepared)
+    with the prepared state as row. Models without readout errors, or with correlated multi-qubit ones that do not factor
+    per qubit, are returned unchanged together with None.
+    """
+    from qiskit_aer.noise import NoiseModel
+
+    local_errors = noise_model._local_readout_errors
+    if (noise_model._default_readout_error is None and not local_errors) or any(len(qubits) != 1 for qubits in local_errors):
+        return noise_model, None
+
+    confusion = np.tile(np.eye(2), (num_qubits, 1, 1))
+    if noise_model._default_readout_error is not None:
+        confusion[:] = np.asarray(noise_model._default_readout_error.probabilities)
+
+    for (qubit,), error in local_errors.items():
+        if qubit < num_qubits:
+            confusion[qubit] = np.asarray(error.probabilities)
+
+    stripped = NoiseModel(basis_gates=noise_model.basis_gates)
+
+    for instruction, errors in noise_model._local_quantum_errors.items():
+        for qubits, error in errors.items():
+            stripped.add_quantum_error(error, instruction, qubits, warnings=False)
+
+    for instruction, error in noise_model._default_quantum_errors.items():
+        stripped.add_all_qubit_quantum_error(error, instruction, warnings=False)
+
+    return stripped, confusion
+
+
+def measured_qubits(circuit: "QuantumCircuit") -> dict[int, int]:
+    """Return which qubit every classical bit was last measured from."""
+    return {
+        circuit.find_bit(clbit).index: circuit.find_bit(qubit).index
+        for instruction in circuit.data if instruction.operation.name == 'measure'
+        for qubit, clbit in zip(instruction.qubits, instruction.clbits)
+    }
+
+
+def counts_to_basis_vector(counts: dict[str, int], num_qubits: int, clbit_qubits: dict[int, int]) -> Optional[np.ndarray]:
+    """
+    Arrange Aer counts, keyed by classical bits, as a histogram over the 2^n basis states of the qubits.
+
+    Returns None unless every qubit was measured into a classical bit of its own, as the outcome of an unmeasured qubit is
+    not part of the counts.
+    """
+    if sorted(clbit_qubits.values()) != list(range(num_qubits)):
+        return None
+
+    histogram = np.zeros(2 ** num_qubits, dtype=int)
+
+    for key, count in counts.items():
+        # Registers are separated by spaces, the last character is classical bit 0
+        bits = key.replace(' ', '')[::-1]
+        histogram[sum(int(bits[clbit]) << qubit for clbit, qubit in clbit_qubits.items())] += count
+
+    return histogram
+
+
+def apply_readout_to_histogram(counts: np.ndarray, confusion: np.ndarray, rng) -> np.ndarray:
+    """Pass every outcome of a histogram over the 2^n basis states through the readout channel."""
+    num_qubits = len(confusion)
+    outcomes = np.repeat(np.arange(len(counts)), np.asarray(counts, dtype=int))
+
+    # Column q holds the bit of qubit q, which is bit q of the little-endian basis index
+    bits = outcomes[:, None] >> np.arange(num_qubits) & 1
+    flipped = apply_readout_flips(bits, confusion, rng)
+
+    return np.bincount(flipped @ (1 << np.arange(num_qubits)), minlength=len(counts))
+
+
+def apply_readout_to_counts(counts: dict[str, int], confusion: np.ndarray, clbit_qubits: dict[int, int], rng) -> dict[str, int]:
+    """Pass every shot of Aer counts through the readout channel of the qubit each classical bit was measured from."""
+    if not counts:
+        return counts
+
+    keys = list(counts)
+    # Registers are separated by spaces, the last character is classical bit 0
+    bit_positions = [index for index, char in enumerate(keys[0]) if char != ' '][::-1]
+    num_clbits = len(bit_positions)
+
+    # Unmeasured classical bits never flip
+    clbit_confusion = np.array([confusion[clbit_qubits[clbit]] if clbit in clbit_qubits else np.eye(2) for clbit in range(num_clbits)])
+
+    shots = np.repeat(np.arange(len(keys)), [counts[key] for key in keys])
+    bits = np.array([[int(key[position]) for position in bit_positions] for key in keys], dtype=int)[shots]
+    flipped = apply_readout_flips(bits, clbit_confusion, rng)
+
+    flipped_counts = Counter()
+    template = list(keys[0])
+    for row in map(tuple, flipped):
+        for position, bit in zip(bit_positions, row):
+            template[position] = str(bit)
+        flipped_counts["".join(template)] += 1
+
+    return dict(flipped_counts)
+
+
+def has_gate_noise(gate_params: dict) -> bool:
+    """Return whether the custom noise configuration of a gate applies any noise."""
+    for noise_type in NoiseParameterType:
+        value = gate_params.get(noise_type.value, None)
+
+        if noise_type == NoiseParameterType.THERMAL_RELAXATION:
+            if value and gate_params.get('gate_time', 0):
+                return True
+        else:
+            try:
+                if float(value or 0) > 0:
+                    return True
+            except ValueError:
+                pass
+
+    return False
+
+
+def scale_gate_noise(noise_params: dict, gate_ref: str, factor: float) -> dict:
+    """
+    Return a copy of a custom noise configuration with the noise of one gate scaled by a factor.
+
+    Probabilities are given in percent and capped at 100, thermal relaxation is scaled through the gate time. A factor of 0
+    drops the gate from the configuration.
+    """
+    scaled = {ref: dict(params) for ref, params in noise_params.items() if ref != gate_ref or factor > 0}
+
+    if factor > 0 and gate_ref in scaled:
+        params = scaled[gate_ref]
+
+        for noise_type in NoiseParameterType:
+            if noise_type != NoiseParameterType.THERMAL_RELAXATION and noise_type.value in params:
+                try:
+                    params[noise_type.value] = min(float(params[noise_type.value] or 0) * factor, 100)
+                except ValueError:
+                    pass
+
+        if params.get(NoiseParameterType.THERMAL_RELAXATION.value):
+            params['gate_time'] = params.get('gate_time', 0) * factor
+
+    return scaled
+
+
+def transpile_for_backend(circuit: "QuantumCircuit", backend, optimization_level: int, seed: int) -> TranspiledCircuit:
+    """Transpile a circuit to the basis gates and coupling map of a device, together with its remapped noise model."""
+    from qiskit import transpile
+    from qiskit_aer.noise import NoiseModel
+
+    transpiled = transpile(circuit, backend=backend, optimization_level=optimization_level, seed_transpiler=seed)
+    compacted, physical_qubits = compact_circuit(transpiled)
+
+    return TranspiledCircuit(compacted, remap_noise_model(NoiseModel.from_backend(backend), physical_qubits), physical_qubits)
+
+
+def estimate_statevector_cost(num_qubits: int, num_instructions: int, shots: int, snapshot_stride: int = 1,
+                              store_statevectors: bool = True, stored_trajectories: Optional[int] = None,
+                              batch_shots: int = 256) -> CostEstimate:
+    """
+    Predict the memory, payload size and runtime of an ideal and a noisy run that save per-shot statevectors.
+
+    The estimate is a first-order model: storage scales with steps x shots x 2^n amplitudes, runtime additionally with the
+    number of instructions and with measuring every trajectory once per step. When fewer trajectories are stored than
+    shots run, only one batch of shots and the stored trajectories are held at once.
+    """
+    num_steps = len(snapshot_steps(num_instructions, snapshot_stride))
+    amplitudes = 2 ** num_qubits
+
+    if stored_trajectories is not None and stored_trajectories < shots:
+        kept_shots = stored_trajectories
+        resident_shots = min(batch_shots, shots) + stored_trajectories
+    else:
+        kept_shots = resident_shots = shots
+
+    # Both the ideal and the noisy run store every step of every shot
+    processed_amplitudes = 2 * num_steps * shots * amplitudes
+    kept_amplitudes = 2 * num_steps * kept_shots * amplitudes
+
+    runtime = (
+        2 * shots * num_instructions * amplitudes * SECONDS_PER_AMPLITUDE_GATE
+        + processed_amplitudes * SECONDS_PER_PROCESSED_AMPLITUDE
+        + 2 * num_steps * shots * SECONDS_PER_SAMPLE
+    )
+
+    return CostEstimate(
+        num_qubits=num_qubits,
+        num_instructions=num_instructions,
+        num_steps=num_steps,
+        shots=shots,
+        snapshot_stride=snapshot_stride,
+        memory_bytes=2 * num_steps * resident_shots * amplitudes * BYTES_PER_AMPLITUDE
+        + kept_amplitudes * (PROCESSING_BYTES_PER_AMPLITUDE - (0 if store_statevectors else STATEVECTOR_PROCESSING_BYTES_PER_AMPLITUDE)),
+        payload_bytes=kept_amplitudes * (PAYLOAD_BYTES_PER_AMPLITUDE - (0 if store_statevectors else STATEVECTOR_PAYLOAD_BYTES_PER_AMPLITUDE)),
+        runtime_seconds=runtime,
+    )
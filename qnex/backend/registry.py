@@ -1,9 +1,80 @@
+import logging
+import threading
+from collections.abc import Iterator, Mapping
+from importlib.metadata import EntryPoint, entry_points
+from typing import Optional
+
 from qnex.backend.base_simulator import BaseSimulator
-from qnex.backend.qiskit.qiskit_simulator import QiskitSimulator
-
-SIMULATOR_REGISTRY: dict[str, BaseSimulator] = {
-    "qiskit": QiskitSimulator(),
-    # "Cirq": CirqSimulator(),
-    # "PennyLane": PennyLaneSimulator(),
-    # "Custom": CustomSimulator()
-}
\ No newline at end of file
+
+logger = logging.getLogger(__name__)
+
+# Entry point group third-party packages can use to register their own simulator backends
+ENTRY_POINT_GROUP = "qnex.backends"
+
+# Backends shipped with QNEX, used when the package is not installed (e.g. when running from a checkout)
+BUILTIN_BACKENDS: dict[str, str] = {
+    "qiskit": "qnex.backend.qiskit.qiskit_simulator:QiskitSimulator",
+    # "Cirq": "qnex.backend.cirq.cirq_simulator:CirqSimulator",
+    # "PennyLane": "qnex.backend.pennylane.pennylane_simulator:PennyLaneSimulator",
+}
+
+
+def _discover_entry_points(group: str) -> list[EntryPoint]:
+    discovered = entry_points()
+
+    # Python 3.9 returns a plain dict of groups, newer versions support selection
+    if hasattr(discovered, "select"):
+        return list(discovered.select(group=group))
+
+    return list(discovered.get(group, []))
+
+
+class SimulatorRegistry(Mapping):
+    """Registry of simulator backends that are discovered through entry points and constructed on first use."""
+
+    def __init__(self, group: str = ENTRY_POINT_GROUP, builtins: Optional[dict[str, str]] = None):
+        self.group = group
+        self.builtins = builtins or {}
+        self._entry_points: Optional[dict[str, EntryPoint]] = None
+        self._instances: dict[str, BaseSimulator] = {}
+        self._lock = threading.Lock()
+
+    def _available(self) -> dict[str, EntryPoint]:
+        if self._entry_points is None:
+            available = {name: EntryPoint(name=name, value=value, group=self.group) for name, value in self.builtins.items()}
+            available.update({entry_point.name: entry_point for entry_point in _discover_entry_points(self.group)})
+
+            self._entry_points = available
+
+        return self._entry_points
+
+    def __getitem__(self, name: str) -> BaseSimulator:
+        simulator = self._instances.get(name)
+        if simulator is not None:
+            return simulator
+
+        entry_point = self._available()[name]
+
+        with self._lock:
+            # Another thread could have constructed the backend while waiting for the lock
+            if name not in self._instances:
+                try:
+                    self._instances[name] = entry_point.load()()
+                except (ImportError, AttributeError) as e:
+                    logger.error("Error loading simulator backend %s: %s", name, e)
+                    raise KeyError(name) from e
+
+            return self._instances[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._available())
+
+    def __len__(self) -> int:
+        return len(self._available())
+
+    def is_loaded(self, name: str) -> bool:
+        """Return whether the backend has already been constructed."""
+        return name in self._instances
+
+
+SIMULATOR_REGISTRY: SimulatorRegistry = SimulatorRegistry(builtins=BUILTIN_BACKENDS)
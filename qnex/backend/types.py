@@ -1,5 +1,7 @@
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
+
 import numpy as np
 
 
@@ -61,10 +63,158 @@ class Gate:
 @dataclass
 class StatevectorResult:
     state_vector: list[complex]
-    counts: list[np.ndarray]
+    # Histogram of measuring this trajectory `shots` times, only present when per-shot counts were requested
+    counts: Optional[np.ndarray]
     probabilities: list[np.ndarray]
 
 
+@dataclass
+class SimulationOptions:
+    # Number of independent seeds to run, spawned from the master seed
+    repetitions: int = 1
+    # Confidence level of the intervals reported for repeated runs
+    confidence: float = 0.95
+    # Run shots in batches until the estimates reach the target standard error, the requested shots act as the budget
+    adaptive: bool = False
+    target_standard_error: float = 0.01
+    batch_shots: int = 256
+    # Wall-clock budget in seconds for the adaptive mode
+    time_budget: Optional[float] = None
+    # Number of process pool shards the shots are split over, each with a seed derived from the master seed
+    shards: int = 1
+    # Transpile to the basis gates and coupling map of the selected device profile before simulating
+    transpile: bool = False
+    optimization_level: int = 1
+    transpile_seed: int = 0
+    # Save a statevector after every n-th instruction, the final state is always saved
+    snapshot_stride: int = 1
+    # Memory a run may use, larger runs fall back to fewer snapshots or are refused. None disables the guard
+    memory_budget: Optional[int] = 4 * 1024 ** 3
+    budget_fallback: bool = True
+    # Share results of seeded runs through the cross-process result cache
+    cache_results: bool = True
+    # Compute per-qubit Bloch vectors, purity and entanglement entropy for every step and shot
+    diagnostics: bool = True
+    # Observables evaluated at every step, as name -> {little-endian Pauli label: coefficient}, e.g. {"ZZ": {"ZZ": 1.0}}
+    observables: Optional[dict[str, dict[str, float]]] = None
+    # Include the per-shot statevectors in the result, turning this off leaves only counts, probabilities and observables
+    store_statevectors: bool = True
+    # Keep per-shot statevectors for only this many uniformly sampled trajectories, all shots still count towards the
+    # counts, fidelity and observables. None keeps every trajectory
+    stored_trajectories: Optional[int] = None
+    # Also sample a histogram for every single trajectory, the per-step counts of the ensemble are always included
+    per_shot_counts: bool = False
+    # Apply readout errors as exact per-qubit confusion matrices instead of simulating them, readout-only noise then
+    # needs no noisy re-simulation
+    analytic_readout: bool = True
+    # Values of the circuit's input parameters by name, required when the circuit declares any
+    parameters: Optional[dict[str, float]] = None
+
+
+@dataclass
+class CostEstimate:
+    num_qubits: int
+    num_instructions: int
+    num_steps: int
+    shots: int
+    snapshot_stride: int
+    memory_bytes: int
+    payload_bytes: int
+    runtime_seconds: float
+
+
+@dataclass
+class IntervalEstimate:
+    mean: np.ndarray
+    std: np.ndarray
+    ci_low: np.ndarray
+    ci_high: np.ndarray
+
+
+@dataclass
+class RepetitionStatistics:
+    repetitions: int
+    confidence: float
+    seeds: list[int]
+    # Mean fidelity per step, aggregated across repetitions
+    fidelity: IntervalEstimate
+    # Final measurement counts per basis state, aggregated across repetitions. None when the circuit does not measure
+    # every qubit into a classical bit of its own
+    ideal_counts: Optional[IntervalEstimate]
+    noisy_counts: Optional[IntervalEstimate]
+
+
+@dataclass
+class AdaptiveShotSummary:
+    shots: int
+    batches: int
+    probability_standard_error: float
+    fidelity_standard_error: float
+    # Either "precision", "shot_budget" or "time_budget"
+    stop_reason: str
+
+
+@dataclass
+class StateDiagnostics:
+    # Bloch vector of every qubit per step and shot, as (steps, shots, qubits, 3). They fully describe the
+    # single-qubit reduced density matrices, rho = (I + r . sigma) / 2
+    bloch_vectors: np.ndarray
+    # Purity Tr(rho^2) of every qubit's reduced state, as (steps, shots, qubits)
+    purity: np.ndarray
+    # Von Neumann entropy in bits between every qubit and the rest, as (steps, shots, qubits)
+    entropy: np.ndarray
+    # Von Neumann entropy in bits between the lower and upper half of the register, as (steps, shots)
+    half_cut_entropy: np.ndarray
+
+
+@dataclass
+class ObservableEstimates:
+    names: list[str]
+    # Expectation value statistics across shots, as (steps, observables)
+    mean: np.ndarray
+    std: np.ndarray
+    standard_error: np.ndarray
+
+
+@dataclass
+class GateSensitivity:
+    gate: str
+    # Final-state infidelity and total variation distance of the outcome distribution from the ideal one, with the noise
+    # of this gate removed or doubled
+    infidelity_removed: float
+    infidelity_doubled: float
+    tvd_removed: float
+    tvd_doubled: float
+    # How much of the baseline infidelity and distance disappears without this gate's noise
+    infidelity_contribution: float
+    tvd_contribution: float
+
+
+@dataclass
+class SensitivityResult:
+    baseline_infidelity: float
+    baseline_tvd: float
+    # Ordered by contribution to the infidelity, largest first
+    gates: list[GateSensitivity]
+    shots: int
+
+
+@dataclass
+class SweepResult:
+    # Value of every parameter at each sweep point
+    parameters: dict[str, list[float]]
+    basis_states: list[str]
+    # Final measurement counts per sweep point, as (points, basis states)
+    ideal_counts: np.ndarray
+    noisy_counts: np.ndarray
+    # Mean fidelity between the final ideal and noisy state per sweep point
+    fidelity: np.ndarray
+    shots: int
+    # Expectation values of the final state, with sweep points in place of steps
+    observables: Optional[dict[str, ObservableEstimates]] = None
+    cost: Optional[CostEstimate] = None
+
+
 @dataclass
 class SimulationResult:
     basis_states: list[str]
@@ -72,3 +222,23 @@ class SimulationResult:
     noisy: dict[str, StatevectorResult]
     ideal_counts: list[np.ndarray]
     noisy_counts: list[np.ndarray]
+    # Counts per basis state at every step, from measuring each shot's trajectory once
+    ideal_step_counts: dict[str, np.ndarray] = field(default_factory=dict)
+    noisy_step_counts: dict[str, np.ndarray] = field(default_factory=dict)
+    # Mean fidelity between the ideal and noisy state for every step
+    fidelity: list[float] = field(default_factory=list)
+    # Operation executed at every step, starting with "init"
+    operations: list[str] = field(default_factory=list)
+    statistics: Optional[RepetitionStatistics] = None
+    # Number of shots that were actually executed
+    shots: int = 0
+    adaptive: Optional[AdaptiveShotSummary] = None
+    # Predicted cost of the configuration that was run, after any budget fallback
+    cost: Optional[CostEstimate] = None
+    # Per-qubit state diagnostics of the "ideal" and "noisy" branch
+    diagnostics: Optional[dict[str, StateDiagnostics]] = None
+    # Expectation values of the requested observables for the "ideal" and "noisy" branch
+    observables: Optional[dict[str, ObservableEstimates]] = None
+    # Exact distribution of measuring the noisy ensemble at every step including readout error, without shot noise.
+    # Only present when readout errors were applied analytically
+    readout_probabilities: Optional[dict[str, np.ndarray]] = None
@@ -0,0 +1,177 @@
+"""
+Run directories of OpenQASM circuits against several noise configurations without the dashboard.
+
+Every circuit is simulated once per noise profile and exported noise model, fanned out over a process pool. Seeded
+runs that are already in the shared result cache are loaded instead of simulated again, so an interrupted batch
+continues where it stopped. One row per run is written to a Parquet or CSV file.
+
+Usage:
+    qnex circuits/ --profile ibm-oslo --noise-model noise_model.json --shots 1024 --workers 8
+    qnex bell.qasm ghz.qasm --profile ibm-kyiv --output results.csv
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Optional
+
+from qnex.backend.types import SimulationOptions
+from qnex.utils.parallel import submit, set_default_workers
+
+OUTPUT_FORMATS = [".parquet", ".csv"]
+
+
+@dataclass
+class NoiseConfiguration:
+    # Profile name, or the file name for exported noise models
+    name: str
+    profile: str
+    noise_params: Optional[dict] = None
+
+
+def find_circuits(paths: list[str]) -> list[Path]:
+    """Expand directories to the .qasm files they contain, recursively and in a stable order."""
+    circuits = []
+
+    for path in map(Path, paths):
+        if path.is_dir():
+            circuits.extend(sorted(path.rglob("*.qasm")))
+        elif path.is_file():
+            circuits.append(path)
+        else:
+            raise FileNotFoundError(f"No such circuit file or directory: {path}")
+
+    return circuits
+
+
+def load_noise_configurations(profiles: list[str], noise_models: list[str]) -> list[NoiseConfiguration]:
+    configurations = [NoiseConfiguration(profile, profile) for profile in profiles]
+
+    for path in map(Path, noise_models):
+        # Same format as the noise model export of the dashboard
+        configurations.append(NoiseConfiguration(path.stem, "custom", json.loads(path.read_text())))
+
+    return configurations
+
+
+def summarize_result(result) -> dict:
+    """Reduce a simulation result to the scalar and JSON columns of one output row."""
+    shots = max(result.shots, 1)
+    outcomes = set(result.ideal_counts) | set(result.noisy_counts)
+
+    return {
+        "num_qubits": len(result.basis_states[0]) if result.basis_states else 0,
+        "num_steps": len(result.operations),
+        "final_fidelity": float(result.fidelity[-1]) if len(result.fidelity) else None,
+        # Total variation distance between the measured ideal and noisy outcome distributions
+        "tvd": 0.5 * sum(abs(result.ideal_counts.get(outcome, 0) - result.noisy_counts.get(outcome, 0)) for outcome in outcomes) / shots,
+        "fidelity": json.dumps([float(fidelity) for fidelity in result.fidelity]),
+        "ideal_counts": json.dumps(result.ideal_counts),
+        "noisy_counts": json.dumps(result.noisy_counts),
+    }
+
+
+def run_job(simulator_ref: str, qasm_str: str, shots: int, seed: int, configuration: NoiseConfiguration,
+            options: SimulationOptions) -> dict:
+    """Simulate one circuit against one noise configuration, runs in a worker process and only returns the summary row."""
+    from qnex.backend.registry import SIMULATOR_REGISTRY
+    from qnex.utils.cache import get_shared_cache
+
+    # Every job already runs on its own worker, so the simulation itself must not fan out again
+    set_default_workers(1)
+
+    simulator = SIMULATOR_REGISTRY[simulator_ref]
+    key = simulator.result_cache_key(qasm_str, shots, seed, configuration.profile, configuration.noise_params, options)
+    cached = key in get_shared_cache("results")
+
+    start = time.perf_counter()
+    try:
+        row = summarize_result(simulator.simulate(qasm_str, shots, seed, configuration.profile, configuration.noise_params, options))
+        error = None
+    except Exception as e:
+        row, error = {}, f"{type(e).__name__}: {e}"
+
+    return {**row, "cached": cached, "seconds": time.perf_counter() - start, "error": error}
+
+
+def write_rows(rows: list[dict], output: Path):
+    import pandas as pd
+
+    frame = pd.DataFrame(rows)
+
+    if output.suffix == ".parquet":
+        frame.to_parquet(output, index=False)
+    else:
+        frame.to_csv(output, index=False)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(prog="qnex", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("circuits", nargs="+", help="OpenQASM files or directories containing them")
+    parser.add_argument("--profile", action="append", default=[], help="Noise profile to run, can be repeated")
+    parser.add_argument("--noise-model", action="append", default=[], help="Noise model JSON exported from the dashboard, can be repeated")
+    parser.add_argument("--shots", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=1, help="Seed of every run, runs are only cached and skipped when seeded")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes, defaults to QNEX_WORKERS or the CPU count")
+    parser.add_argument("--backend", default="qiskit", help="Simulator backend to use")
+    parser.add_argument("--output", default="qnex-results.parquet", help=f"Output file, one of {', '.join(OUTPUT_FORMATS)}")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    if output.suffix not in OUTPUT_FORMATS:
+        parser.error(f"Unsupported output format '{output.suffix}', use one of {', '.join(OUTPUT_FORMATS)}")
+    if output.suffix == ".parquet" and find_spec("pyarrow") is None:
+        # Checked up front, so a long batch does not fail when writing its results
+        parser.error("Writing Parquet needs pyarrow, install it or write to a .csv file instead")
+
+    if not args.profile and not args.noise_model:
+        parser.error("Give at least one --profile or --noise-model")
+
+    if args.workers is not None:
+        set_default_workers(args.workers)
+
+    circuits = find_circuits(args.circuits)
+    configurations = load_noise_configurations(args.profile, args.noise_model)
+
+    # Statevectors and diagnostics are not part of the output, leaving them out keeps the workers and the cache small
+    options = SimulationOptions(diagnostics=False, store_statevectors=False)
+
+    jobs = [(circuit, configuration) for circuit in circuits for configuration in configurations]
+    qasm_strs = {circuit: circuit.read_text() for circuit in circuits}
+
+    futures = {
+        submit(run_job, args.backend, qasm_strs[circuit], args.shots, args.seed, configuration, options): index
+        for index, (circuit, configuration) in enumerate(jobs)
+    }
+
+    # Completion order depends on the pool, the output follows the input order
+    rows = [None] * len(jobs)
+    for completed, future in enumerate(as_completed(futures), start=1):
+        index = futures[future]
+        circuit, configuration = jobs[index]
+
+        row = {"circuit": str(circuit), "noise": configuration.name, "shots": args.shots, "seed": args.seed, **future.result()}
+        rows[index] = row
+
+        if row["error"]:
+            status = row["error"]
+        else:
+            timing = "cached" if row["cached"] else f"{row['seconds']:.1f} s"
+            status = f"fidelity {row['final_fidelity']:.4f}, tvd {row['tvd']:.4f} ({timing})"
+
+        print(f"[{completed}/{len(jobs)}] {circuit} × {configuration.name}: {status}", file=sys.stderr)
+
+    write_rows(rows, output)
+    print(f"Wrote {len(rows)} runs to {output}", file=sys.stderr)
+
+    failed = sum(1 for row in rows if row["error"])
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,6 @@
+import logging
+import os
+
 import dash_mantine_components as dmc
 import diskcache
 from dash import Dash, _dash_renderer
@@ -7,6 +10,10 @@ from qnex.dashboard.components.organisms.pane_qasm import create_pane_qasm
 from qnex.dashboard.components.organisms.pane_visualizations import create_visualizations
 from qnex.dashboard.components.organisms.pane_simulation import create_pane_simulation
 from qnex.dashboard.components.organisms.toolbar import create_toolbar
+from qnex.dashboard.routes.export import export_blueprint
+from qnex.dashboard.routes.jobs import jobs_blueprint
+from qnex.dashboard.routes.metrics import metrics_blueprint
+from qnex.utils.cache import CACHE_DIRECTORY
 
 # Dash Mantine Components is based on REACT 18. You must set the env variable REACT_VERSION=18.2.0 before starting up the app.
 _dash_renderer._set_react_version("18.2.0")
@@ -18,14 +25,19 @@ external_scripts = [
     'https://fonts.googleapis.com/css2?family=Poiret+One&display=swap',
 ]
 
-# Initialize long callback manager for long-running jobs
-cache = diskcache.Cache("./.cache")
+# Initialize long callback manager for long-running jobs, shared by all gunicorn workers
+cache = diskcache.Cache(os.path.join(CACHE_DIRECTORY, "callbacks"))
 long_callback_manager = DiskcacheLongCallbackManager(cache)
 
 # Initialize Dash app
 app = Dash(__name__, external_scripts=external_scripts + dmc.styles.ALL, long_callback_manager=long_callback_manager)
 server = app.server
 
+# Downloads, the JSON job API and the Prometheus metrics are served by Flask directly instead of going through callbacks
+server.register_blueprint(export_blueprint)
+server.register_blueprint(jobs_blueprint)
+server.register_blueprint(metrics_blueprint)
+
 # https://stackoverflow.com/questions/69258350/difficulty-getting-custom-google-font-working-for-plotly-dash-app
 app.css.config.serve_locally = True
 
@@ -67,4 +79,5 @@ app.layout = dmc.MantineProvider(
 )
 
 if __name__ == '__main__':
+    logging.basicConfig(level=os.environ.get("QNEX_LOG_LEVEL", "INFO"))
     app.run_server(debug=True)
@@ -0,0 +1,138 @@
+// Clientside callbacks that index into the compact simulation view, so scrubbing through steps and shots never
+// needs a round trip to the server.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    qnex: {
+        selectStateVector: function (currentStep, view, nIntervals) {
+            if (!view) {
+                return window.dash_clientside.no_update;
+            }
+
+            const triggered = window.dash_clientside.callback_context.triggered.map(t => t.prop_id);
+            const index = view.steps.indexOf(currentStep);
+
+            // Advance to the next step while playing, wrapping around at the end of the circuit
+            if (triggered.includes('interval-visualization-play.n_intervals')) {
+                return view.steps[(index + 1) % view.steps.length];
+            }
+
+            // Keep the selected step if it still exists, otherwise show the final state
+            return index >= 0 ? currentStep : view.steps[view.steps.length - 1];
+        },
+
+        updateVisualizeShotMax: function (shots, view) {
+            // Adaptive runs can use fewer shots than requested
+            const max = (view && view.shots) || shots || 1;
+
+            return [max, [{value: 0, label: '1'}, {value: max - 1, label: String(max)}]];
+        },
+
+        togglePlay: function (nClicks, disabled) {
+            return [!disabled, disabled ? 'filled' : 'light'];
+        },
+
+        updateCounts: function (view, step, shot, figure) {
+            if (!view || !step) {
+                return emptyFigure(figure);
+            }
+
+            const shotIndex = (shot || 1) - 1;
+            const isFinalStep = step === view.steps[view.steps.length - 1];
+            const profiles = Object.keys(view.comparisons);
+
+            let ys, errors;
+            if (isFinalStep) {
+                ys = [view.final_counts.ideal, view.final_counts.noisy]
+                    .concat(profiles.map(profile => view.comparisons[profile].final_counts));
+                errors = [view.final_counts.ideal_error, view.final_counts.noisy_error];
+            } else {
+                // Show the histogram of the selected shot when it was sampled, otherwise the counts of all shots at this step.
+                // Compared profiles only report their final counts
+                ys = (view.ideal_shot_counts
+                    ? [view.ideal_shot_counts[step][shotIndex], view.noisy_shot_counts[step][shotIndex]]
+                    : [view.ideal_counts[step], view.noisy_counts[step]])
+                    .concat(profiles.map(() => []));
+                errors = [];
+            }
+
+            return {data: barTraces(figure, view, ys, errors), layout: figure.layout};
+        },
+
+        updateProbabilities: function (view, shot, step, figure) {
+            if (!view || !step) {
+                return emptyFigure(figure);
+            }
+
+            const shotIndex = (shot || 1) - 1;
+            const profiles = Object.keys(view.comparisons);
+
+            const ys = [view.ideal_probabilities[step][shotIndex], view.noisy_probabilities[step][shotIndex]]
+                .concat(profiles.map(profile => view.comparisons[profile].probabilities[step][shotIndex]));
+
+            const layout = Object.assign({}, figure.layout, {
+                title: {
+                    text: `Probabilities for shot #${shotIndex + 1}<br>` +
+                        '<sup>Measurement probabilities for each quantum basis state.</sup>'
+                }
+            });
+
+            return {data: barTraces(figure, view, ys, []), layout: layout};
+        },
+
+        updateBloch: function (view, step, shot, figure) {
+            const shotIndex = (shot || 1) - 1;
+
+            // The wireframe trace is kept as is, only the ideal and noisy vectors are replaced
+            const data = figure.data.slice(0, 3).map((trace, index) => {
+                if (index === 0) {
+                    return trace;
+                }
+
+                const key = index === 1 ? 'ideal_bloch' : 'noisy_bloch';
+                const vectors = view && step && view[key] && view[key][step] ? view[key][step][shotIndex] : [];
+
+                return Object.assign({}, trace, blochVectorTrace(vectors));
+            });
+
+            return {data: data, layout: figure.layout};
+        },
+    }
+});
+
+// Draws one line from the origin to the Bloch vector of every qubit, separated by gaps
+function blochVectorTrace(vectors) {
+    const trace = {x: [], y: [], z: [], text: []};
+
+    vectors.forEach((vector, qubit) => {
+        trace.x.push(0, vector[0], null);
+        trace.y.push(0, vector[1], null);
+        trace.z.push(0, vector[2], null);
+        trace.text.push('', `q${qubit}`, '');
+    });
+
+    return trace;
+}
+
+function emptyFigure(figure) {
+    const data = figure.data.slice(0, 2).map(trace => Object.assign({}, trace, {x: [], y: []}));
+
+    return {data: data, layout: figure.layout};
+}
+
+// Reuses the styling of the ideal and noisy traces and appends one trace for every compared profile
+function barTraces(figure, view, ys, errors) {
+    const traces = figure.data.slice(0, 2).map((trace, index) => Object.assign({}, trace, {
+        x: view.basis_states,
+        y: ys[index],
+        error_y: errors[index] || {visible: false},
+    }));
+
+    Object.keys(view.comparisons).forEach((profile, index) => traces.push({
+        type: 'bar',
+        name: profile,
+        marker: {pattern: {shape: 'x'}},
+        x: view.basis_states,
+        y: ys[2 + index],
+    }));
+
+    return traces;
+}
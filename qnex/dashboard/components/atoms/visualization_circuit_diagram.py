@@ -1,89 +1,255 @@
-import base64
-from io import BytesIO
+import logging
 
 import plotly.graph_objects as go
-from dash import Output, Input, dcc
-from qiskit import qasm3, qasm2
-from qiskit.visualization import circuit_drawer
+from dash import Output, Input, dcc, Patch, no_update
 
-from qnex.backend.qiskit.qiskit_simulator import QiskitSimulator
+from qnex.backend.registry import SIMULATOR_REGISTRY
+from qnex.utils.cache import get_or_compute
+from qnex.utils.hashing import stable_hash
 
+logger = logging.getLogger(__name__)
 
-def create_visualization_circuit_diagram(app):
-    qiskit_sim = QiskitSimulator()
+# Size of a gate box in data units, every gate layer is one unit wide and every wire one unit apart
+GATE_WIDTH = 0.7
+GATE_HEIGHT = 0.6
+
+# Number of gate layers that are visible before panning
+VISIBLE_COLUMNS = 30
+
+ROW_HEIGHT_PX = 48
+MIN_HEIGHT_PX = 350
+
+
+def format_gate_label(operation) -> str:
+    if not operation.params:
+        return operation.name
+
+    def format_param(param):
+        try:
+            return f"{float(param):.3g}"
+        except TypeError:
+            # Unbound parameters are shown by name
+            return str(param)
+
+    return f"{operation.name}({', '.join(format_param(param) for param in operation.params)})"
+
+
+def format_bit_label(circuit, bit, fallback: str) -> str:
+    location = circuit.find_bit(bit)
+
+    if location.registers:
+        register, index = location.registers[0]
+        return f"{register.name}[{index}]"
+
+    return fallback
+
+
+def build_circuit_diagram(circuit) -> dict:
+    """
+    Lay out a circuit as native Plotly traces, with one column per gate layer and one row per qubit.
+
+    Every kind of element is drawn by a single trace, so the diagram stays vector-based and cheap to render for
+    hundreds of gates. Measured classical bits share one row below the qubits.
+    """
+    num_qubits = circuit.num_qubits
+    classical_row = num_qubits if circuit.num_clbits else None
+    rows = num_qubits + (1 if circuit.num_clbits else 0)
+
+    boxes = ([], [])
+    connectors = ([], [])
+    dashed = ([], [])
+    controls = ([], [])
+    targets = ([], [])
+    swaps = ([], [])
+    labels = ([], [], [], [])
+
+    def add_segment(trace, x0, row0, x1, row1):
+        trace[0].extend([x0, x1, None])
+        trace[1].extend([-row0, -row1, None])
+
+    def add_box(column, top_row, bottom_row, label, hover):
+        left, right = column - GATE_WIDTH / 2, column + GATE_WIDTH / 2
+        top, bottom = -top_row + GATE_HEIGHT / 2, -bottom_row - GATE_HEIGHT / 2
+
+        boxes[0].extend([left, right, right, left, left, None])
+        boxes[1].extend([top, top, bottom, bottom, top, None])
+
+        labels[0].append(column)
+        labels[1].append(-(top_row + bottom_row) / 2)
+        labels[2].append(label)
+        labels[3].append(hover)
+
+    # Index of the first free column on every row
+    next_free = [0] * rows
+
+    for instruction in circuit.data:
+        operation = instruction.operation
+        qubits = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+        clbits = [circuit.find_bit(clbit).index for clbit in instruction.clbits]
+
+        if not qubits:
+            continue
+
+        low, high = min(qubits), max(qubits)
+        if clbits and classical_row is not None:
+            high = classical_row
 
+        # Gates spanning several rows block everything in between, so connectors never cross other gates
+        column = max(next_free[low:high + 1])
+        for row in range(low, high + 1):
+            next_free[row] = column + 1
+
+        label = format_gate_label(operation)
+        hover = f"{label} on {', '.join(f'q{qubit}' for qubit in qubits)}"
+
+        num_ctrl_qubits = getattr(operation, 'num_ctrl_qubits', 0)
+        base_gate = getattr(operation, 'base_gate', None)
+
+        if operation.name == 'barrier':
+            add_segment(dashed, column, min(qubits) - 0.4, column, max(qubits) + 0.4)
+        elif operation.name == 'measure':
+            add_segment(dashed, column, qubits[0], column, classical_row)
+            add_box(column, qubits[0], qubits[0], "M", f"measure q{qubits[0]} → c{clbits[0]}")
+
+            labels[0].append(column + 0.15)
+            labels[1].append(-classical_row - 0.25)
+            labels[2].append(f"<sub>{clbits[0]}</sub>")
+            labels[3].append(f"c{clbits[0]}")
+        elif operation.name == 'swap':
+            add_segment(connectors, column, low, column, high)
+            for qubit in qubits:
+                swaps[0].append(column)
+                swaps[1].append(-qubit)
+        elif num_ctrl_qubits and base_gate is not None:
+            control_qubits, target_qubits = qubits[:num_ctrl_qubits], qubits[num_ctrl_qubits:]
+            add_segment(connectors, column, low, column, high)
+
+            for qubit in control_qubits:
+                controls[0].append(column)
+                controls[1].append(-qubit)
+
+            if base_gate.name == 'x' and len(target_qubits) == 1:
+                targets[0].append(column)
+                targets[1].append(-target_qubits[0])
+            elif base_gate.name == 'swap':
+                for qubit in target_qubits:
+                    swaps[0].append(column)
+                    swaps[1].append(-qubit)
+            else:
+                add_box(column, min(target_qubits), max(target_qubits), format_gate_label(base_gate), hover)
+        else:
+            add_box(column, low, high, label, hover)
+
+    columns = max(next_free, default=0)
+
+    wires = ([], [])
+    for row in range(num_qubits):
+        add_segment(wires, -0.5, row, max(columns, 1) - 0.5, row)
+
+    classical_wires = ([], [])
+    if classical_row is not None:
+        for offset in [-0.04, 0.04]:
+            add_segment(classical_wires, -0.5, classical_row + offset, max(columns, 1) - 0.5, classical_row + offset)
+
+    def line_trace(trace, color, dash='solid'):
+        return go.Scatter(x=trace[0], y=trace[1], mode='lines', line=dict(color=color, width=1.5, dash=dash),
+                          hoverinfo='skip', showlegend=False)
+
+    def marker_trace(trace, symbol, size):
+        return go.Scatter(x=trace[0], y=trace[1], mode='markers', hoverinfo='skip', showlegend=False,
+                          marker=dict(symbol=symbol, size=size, color='#1c7ed6', line=dict(color='#1c7ed6', width=2)))
+
+    data = [
+        line_trace(wires, '#868e96'),
+        line_trace(classical_wires, '#adb5bd'),
+        line_trace(connectors, '#1c7ed6'),
+        line_trace(dashed, '#adb5bd', dash='dash'),
+        go.Scatter(x=boxes[0], y=boxes[1], mode='lines', fill='toself', fillcolor='#e7f5ff',
+                   line=dict(color='#1c7ed6', width=1.5), hoverinfo='skip', showlegend=False),
+        go.Scatter(x=labels[0], y=labels[1], text=labels[2], hovertext=labels[3], mode='text',
+                   textfont=dict(color='black'), hoverinfo='text', showlegend=False),
+        marker_trace(controls, 'circle', 9),
+        marker_trace(targets, 'circle-cross-open', 20),
+        marker_trace(swaps, 'x-thin-open', 12),
+    ]
+
+    row_labels = [format_bit_label(circuit, qubit, f"q{index}") for index, qubit in enumerate(circuit.qubits)]
+    if classical_row is not None:
+        row_labels.append(", ".join(register.name for register in circuit.cregs) or "c")
+
+    return {
+        'data': [trace.to_plotly_json() for trace in data],
+        'xaxis_range': [-1, min(max(columns, 1), VISIBLE_COLUMNS)],
+        'yaxis_range': [-rows + 0.5, 0.5],
+        'yaxis_tickvals': [-row for row in range(rows)],
+        'yaxis_ticktext': row_labels,
+        'height': max(MIN_HEIGHT_PX, rows * ROW_HEIGHT_PX + 74),
+    }
+
+
+def create_visualization_circuit_diagram(app):
     fig = go.Figure()
     fig.update_layout(
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)',
         font_color='black',
         xaxis=dict(
-            zerolinecolor="#ebebeb",
-            gridcolor="#ebebeb",
-            tickfont_color="black",
-            range=[0, 1],
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False,
+            range=[-1, 1],
         ),
         yaxis=dict(
-            zerolinecolor="#ebebeb",
-            gridcolor="#ebebeb",
+            showgrid=False,
+            zeroline=False,
             tickfont_color="black",
+            fixedrange=True,
             range=[-1, 0],
         ),
         margin={'t': 50, 'b': 24, 'l': 36, 'r': 36},
-        height=350,
+        height=MIN_HEIGHT_PX,
         title="Circuit Diagram",
         dragmode='pan'  # Set the default interaction mode to pan
     )
 
     @app.callback(
         Output('visualization-circuit-diagram', 'figure'),
-        Input('input-qasm', 'value')
+        Input('input-qasm', 'value'),
+        Input('select-simulator-backend', 'value'),
     )
-    def update_diagram(qasm_str):
+    def update_diagram(qasm_str, simulator_ref):
+        from qiskit import qasm3, qasm2
+
+        # Check if the simulator exists in the SIMULATOR_REGISTRY
+        simulator = SIMULATOR_REGISTRY.get(simulator_ref, None)
+
+        if simulator is None or not qasm_str:
+            return no_update
+
         try:
-            # Load the circuit from QASM
-            circuit = qiskit_sim.load_circuit(qasm_str)
-
-            # Draw the circuit with customized style
-            circuit_fig = circuit_drawer(circuit, output='mpl', style={
-                'backgroundcolor': '#00000000',
-            })
-
-            # Remove padding by adjusting the figure layout
-            circuit_fig.tight_layout(pad=0)
-
-            # Save to a buffer
-            buffer = BytesIO()
-            circuit_fig.savefig(buffer, bbox_inches='tight', pad_inches=0)  # bbox_inches='tight' helps minimize padding
-            buffer.seek(0)
-
-            fig.update_layout(
-                images=[
-                    dict(
-                        source=f'data:image/png;base64,{base64.b64encode(buffer.read()).decode()}',
-                        xref="x",
-                        yref="y",
-                        x=0,
-                        y=0,
-                        sizex=1,
-                        sizey=1,
-                        xanchor="left",
-                        yanchor="bottom",
-                        layer="above",
-                    )
-                ],
-                xaxis=dict(range=[0, 1]),
-                yaxis=dict(range=[0, 1]),
+            # The layout only depends on the circuit, so identical inputs are shared between sessions and workers
+            diagram = get_or_compute(
+                "diagrams",
+                stable_hash(simulator_ref, qasm_str),
+                lambda: build_circuit_diagram(simulator.load_circuit(qasm_str)),
             )
-
-            # Return the image as a base64-encoded PNG
-            return fig
         except (qasm3.QASM3ImporterError, qasm2.QASM2ParseError):
-            # Provide fallback image in case of error
-            return fig
+            # Keep the last valid diagram in case of error
+            return no_update
         except Exception as e:
             # Catch other potential errors
-            print(f"Error generating circuit diagram: {e}")
-            return fig
+            logger.exception("Error generating circuit diagram: %s", e)
+            return no_update
+
+        # Only send the traces and axes, the rest of the figure stays as it is on the client
+        patched = Patch()
+        patched['data'] = diagram['data']
+        patched['layout']['xaxis']['range'] = diagram['xaxis_range']
+        patched['layout']['yaxis']['range'] = diagram['yaxis_range']
+        patched['layout']['yaxis']['tickvals'] = diagram['yaxis_tickvals']
+        patched['layout']['yaxis']['ticktext'] = diagram['yaxis_ticktext']
+        patched['layout']['height'] = diagram['height']
+
+        return patched
 
     return dcc.Graph(id='visualization-circuit-diagram', figure=fig)
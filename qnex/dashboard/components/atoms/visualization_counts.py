@@ -1,8 +1,21 @@
-from dash import Input, Output, dcc
+import numpy as np
+from dash import Input, Output, State, dcc, ClientsideFunction
 import plotly.graph_objects as go
 from plotly.graph_objs.bar.marker import Pattern
 
 
+def create_error_bars(estimate):
+    mean = np.asarray(estimate['mean'])
+
+    return dict(
+        type='data',
+        symmetric=False,
+        array=np.asarray(estimate['ci_high']) - mean,
+        arrayminus=mean - np.asarray(estimate['ci_low']),
+        visible=True,
+    )
+
+
 def create_visualization_shots(app):
     fig = go.Figure()
     fig.update_layout(
@@ -39,41 +52,14 @@ def create_visualization_shots(app):
         marker=dict(color='red', pattern=Pattern(shape='/')),
     ))
 
-    @app.callback(
+    # Indexing into the compact simulation view runs in the browser, so scrubbing never reaches the server
+    app.clientside_callback(
+        ClientsideFunction(namespace='qnex', function_name='updateCounts'),
         Output('visualization-counts', 'figure'),
-        Input('simulation-results', 'data'),
+        Input('simulation-view', 'data'),
         Input('select-state-vector', 'value'),
-        Input('input-visualize-shot', 'value')
+        Input('input-visualize-shot', 'value'),
+        State('visualization-counts', 'figure'),
     )
-    def update_data(simulation_results, selected_state_vector, selected_shot):
-        if selected_state_vector is None:
-            fig.update_traces(selector=dict(name="Ideal"), y=[])
-            fig.update_traces(selector=dict(name="Noisy"), y=[])
-
-            return fig
-
-        # Extract ideal and noisy state vectors
-        selected_shot_index = selected_shot - 1
-
-        # TODO: This is currently a bit ugly, need to find better alternative for this
-        if selected_state_vector == list(simulation_results['ideal'].keys())[-1]:
-            counts_ideal = [simulation_results['ideal_counts'].get(state, 0) for state in simulation_results['basis_states']]
-            counts_noisy = [simulation_results['noisy_counts'].get(state, 0) for state in simulation_results['basis_states']]
-        else:
-            counts_ideal = simulation_results['ideal'][selected_state_vector][selected_shot_index]['counts']
-            counts_noisy = simulation_results['noisy'][selected_state_vector][selected_shot_index]['counts']
-
-        fig.update_traces(
-            selector=dict(name="Ideal"),
-            x=simulation_results['basis_states'],
-            y=counts_ideal
-        )
-        fig.update_traces(
-            selector=dict(name="Noisy"),
-            x=simulation_results['basis_states'],
-            y=counts_noisy
-        )
-
-        return fig
 
     return dcc.Graph(id='visualization-counts', figure=fig)
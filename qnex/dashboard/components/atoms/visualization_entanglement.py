@@ -0,0 +1,74 @@
+import plotly.graph_objects as go
+from dash import Input, Output, dcc, Patch, no_update
+
+
+def create_visualization_entanglement(app):
+    fig = go.Figure(
+        data=go.Heatmap(
+            z=[],  # Initial empty data
+            colorscale='viridis',
+            colorbar=dict(
+                title='Mean Entropy [bits]',
+                tickvals=[0, 0.5, 1],
+                ticktext=['0', '0.5', '1'],
+                tickmode='array',
+                orientation='h',
+                thickness=10,
+            ),
+            zmin=0,
+            zmax=1
+        )
+    )
+
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='black',
+        xaxis=dict(
+            zerolinecolor="#ebebeb",
+            gridcolor="#ebebeb",
+            tickfont_color="black",
+        ),
+        yaxis=dict(
+            zerolinecolor="#ebebeb",
+            gridcolor="#ebebeb",
+            tickfont_color="black",
+        ),
+        margin={'t': 100, 'b': 24, 'l': 36, 'r': 36},
+        height=140,
+        title="Entanglement Entropy<br><sup>Von Neumann entropy between each qubit and the rest of the register</sup>",
+    )
+
+    @app.callback(
+        Output('visualization-entanglement', 'figure'),
+        Input('simulation-view', 'data'),
+    )
+    def update_data(simulation_view):
+        if simulation_view is None or simulation_view.get('entropy') is None:
+            return no_update
+
+        entropy = simulation_view['entropy']
+
+        # Ideal and noisy rows of the same qubit are shown next to each other
+        z, y_tick_text = [], []
+        for qubit, (ideal, noisy) in enumerate(zip(entropy['ideal'], entropy['noisy'])):
+            z += [ideal, noisy]
+            y_tick_text += [f"q{qubit} ideal", f"q{qubit} noisy"]
+
+        operations = simulation_view['operations']
+        tick_text = ['Init' if op == 'init' else op for op in operations]
+
+        # Only send the heatmap values and axis ticks, the rest of the figure stays as it is on the client
+        patched = Patch()
+        patched['data'][0]['z'] = z
+        patched['layout']['xaxis']['tickmode'] = 'array'
+        patched['layout']['xaxis']['tickvals'] = list(range(len(tick_text)))
+        patched['layout']['xaxis']['ticktext'] = tick_text
+        patched['layout']['yaxis']['tickmode'] = 'array'
+        patched['layout']['yaxis']['tickvals'] = list(range(len(y_tick_text)))
+        patched['layout']['yaxis']['ticktext'] = y_tick_text
+        patched['layout']['height'] = 140 + 30 * (len(z) - 1)
+
+        return patched
+
+    return dcc.Graph(id='visualization-entanglement', figure=fig)
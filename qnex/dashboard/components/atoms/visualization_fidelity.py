@@ -1,9 +1,8 @@
 import numpy as np
 import plotly.graph_objects as go
-from dash import Input, Output, dcc, State
+from dash import Input, Output, dcc, State, Patch, no_update
 
 from qnex.backend.registry import SIMULATOR_REGISTRY
-from qnex.utils.quantum import compute_quantum_fidelity
 
 
 def create_visualization_fidelity(app):
@@ -56,38 +55,49 @@ def create_visualization_fidelity(app):
         simulator = SIMULATOR_REGISTRY.get(simulator_ref, None)
 
         if simulator is None or simulation_results is None:
-            # Return an empty array if simulator does not exist
-            return fig
+            # Keep the empty heatmap if simulator does not exist
+            return no_update
 
         # Extract state vector keys and compute mean fidelity differences
         sv_keys = list(simulation_results['ideal'].keys())
 
         supported_ops = simulator.supported_operations()
-        used_ops = ["init"] + simulator.used_operations(qasm_str)
+        # Transpiled runs execute different operations than the ones in the QASM input
+        used_ops = simulation_results.get('operations') or ["init"] + simulator.used_operations(qasm_str)
 
         tick_text = [
             'Init' if op == 'init' else (supported_ops[op].short_name if op in supported_ops else f"?")
             for (op, sv) in zip(used_ops, sv_keys)
         ]
 
-        mean_differences = [
-            np.mean([compute_quantum_fidelity(sv_ideal['state_vector'], sv_noisy['state_vector']) for sv_ideal, sv_noisy in
-                     zip(simulation_results['ideal'][sv_name], simulation_results['noisy'][sv_name])])
-            for sv_name in sv_keys
-        ]
+        statistics = simulation_results.get('statistics')
+        comparisons = simulation_results.get('comparisons')
 
-        mean_differences = np.array(mean_differences).reshape(1, -1)
+        if comparisons:
+            # Show one row for every compared noise profile
+            profiles = [simulation_results.get('profile') or 'Noisy'] + list(comparisons.keys())
+            mean_differences = np.array([simulation_results['fidelity']] + [comparison['fidelity'] for comparison in comparisons.values()])
+            y_tick_text = profiles
+        elif statistics:
+            # Show the confidence band across repetitions around the mean fidelity
+            fidelity = statistics['fidelity']
+            mean_differences = np.array([fidelity['ci_low'], fidelity['mean'], fidelity['ci_high']])
+            y_tick_text = [f"{statistics['confidence']:.0%} CI low", "Mean", "CI high"]
+        else:
+            mean_differences = np.array(simulation_results['fidelity']).reshape(1, -1)
+            y_tick_text = []
 
-        fig.update_traces(z=mean_differences)
-        fig.update_layout(
-            xaxis={
-                'tickmode': 'array',
-                'tickvals': np.arange(len(mean_differences)),
-                'ticktext': tick_text
-            },
-            yaxis={'tickvals': []},
-        )
+        # Only send the heatmap values and axis ticks, the rest of the figure stays as it is on the client
+        patched = Patch()
+        patched['data'][0]['z'] = mean_differences
+        patched['layout']['xaxis']['tickmode'] = 'array'
+        patched['layout']['xaxis']['tickvals'] = np.arange(mean_differences.shape[1])
+        patched['layout']['xaxis']['ticktext'] = tick_text
+        patched['layout']['yaxis']['tickmode'] = 'array'
+        patched['layout']['yaxis']['tickvals'] = np.arange(len(y_tick_text))
+        patched['layout']['yaxis']['ticktext'] = y_tick_text
+        patched['layout']['height'] = 140 + 30 * (mean_differences.shape[0] - 1)
 
-        return fig
+        return patched
 
     return dcc.Graph(id='visualization-fidelity', figure=fig)
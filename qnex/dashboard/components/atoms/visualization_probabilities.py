@@ -1,5 +1,5 @@
 import plotly.graph_objects as go
-from dash import Input, Output, dcc
+from dash import Input, Output, State, dcc, ClientsideFunction
 from plotly.graph_objs.bar.marker import Pattern
 
 
@@ -42,41 +42,14 @@ def create_visualization_probabilities(app):
         marker=dict(color='red', pattern=Pattern(shape='/')),
     ))
 
-    @app.callback(
+    # Indexing into the compact simulation view runs in the browser, so scrubbing never reaches the server
+    app.clientside_callback(
+        ClientsideFunction(namespace='qnex', function_name='updateProbabilities'),
         Output('visualization-probabilities', 'figure'),
-        Input('simulation-results', 'data'),
+        Input('simulation-view', 'data'),
         Input('input-visualize-shot', 'value'),
-        Input('select-state-vector', 'value')
+        Input('select-state-vector', 'value'),
+        State('visualization-probabilities', 'figure'),
     )
-    def update_data(simulation_results, selected_shot, selected_state_vector):
-        if selected_state_vector is None:
-            fig.update_traces(selector=dict(name="Ideal"), y=[])
-            fig.update_traces(selector=dict(name="Noisy"), y=[])
-
-            return fig
-
-        selected_shot_index = selected_shot - 1
-
-        # Extract ideal and noisy state vectors
-        probabilities_ideal = simulation_results['ideal'][selected_state_vector][selected_shot_index]['probabilities']
-        probabilities_noisy = simulation_results['noisy'][selected_state_vector][selected_shot_index]['probabilities']
-
-        fig.update_layout(
-            title=f"Probabilities for shot #{selected_shot}<br>"
-                  f"<sup>Measurement probabilities for each quantum basis state.</sup>"
-        )
-
-        fig.update_traces(
-            selector=dict(name="Ideal"),
-            x=simulation_results['basis_states'],
-            y=probabilities_ideal
-        )
-        fig.update_traces(
-            selector=dict(name="Noisy"),
-            x=simulation_results['basis_states'],
-            y=probabilities_noisy
-        )
-
-        return fig
 
     return dcc.Graph(id='visualization-probabilities', figure=fig)
@@ -1,89 +1,93 @@
 import dash_mantine_components as dmc
 import numpy as np
-from dash import dcc
+from dash import Input, Output, State, dcc, ClientsideFunction
 import plotly.graph_objects as go
 
 
-def statevector_to_bloch(statevector):
-    # Flattening and ensuring the statevector is a 1D array
-    statevector = np.array(statevector).flatten()
+def create_sphere_wireframe(meridians: int = 12, parallels: int = 7, resolution: int = 40) -> np.ndarray:
+    """Return the (3, points) coordinates of a unit sphere wireframe, with NaN separating the individual circles."""
+    # Meridians run from pole to pole at a fixed azimuth
+    azimuth = np.linspace(0, 2 * np.pi, meridians, endpoint=False)[:, None]
+    inclination = np.linspace(0, np.pi, resolution)[None, :]
+    meridian_lines = np.stack(np.broadcast_arrays(
+        np.cos(azimuth) * np.sin(inclination),
+        np.sin(azimuth) * np.sin(inclination),
+        np.cos(inclination),
+    ))
 
-    # Normalize the statevector (it should already be normalized, but let's ensure it)
-    statevector = statevector / np.linalg.norm(statevector)
+    # Parallels circle the sphere at a fixed inclination, leaving out the poles
+    inclination = np.linspace(0, np.pi, parallels + 2)[1:-1, None]
+    azimuth = np.linspace(0, 2 * np.pi, resolution)[None, :]
+    parallel_lines = np.stack(np.broadcast_arrays(
+        np.cos(azimuth) * np.sin(inclination),
+        np.sin(azimuth) * np.sin(inclination),
+        np.cos(inclination),
+    ))
 
-    # Extract alpha and beta for a single qubit
-    alpha = statevector[0] + 1j * statevector[1]  # Real and Imaginary parts of statevector[0]
-    beta = statevector[2] + 1j * statevector[3]  # Real and Imaginary parts of statevector[1]
+    lines = np.concatenate([meridian_lines, parallel_lines], axis=1)
+    separators = np.full((3, lines.shape[1], 1), np.nan)
 
-    # Calculate theta and phi
-    theta = 2 * np.arccos(np.abs(alpha))  # Inclination
-    phi = np.angle(beta)  # Azimuthal angle (angle of beta)
-
-    return theta, phi
+    return np.concatenate([lines, separators], axis=2).reshape(3, -1)
 
 
 def create_visualization_qsphere(app):
-    # @app.callback(
-    #     Output('visualization-qsphere', 'figure'),
-    #     Input('simulation-results', 'data'),
-    #     Input('select-state-vector', 'value'),
-    #     prevent_initial_call=True
-    # )
-    # def update_data(simulation_results, state_vector):
-    # Reduced resolution for faster rendering
-    u = np.linspace(0, 2 * np.pi, 30)  # Reduce number of points
-    v = np.linspace(0, np.pi, 15)  # Reduce number of points
-    x = np.outer(np.cos(u), np.sin(v))
-    y = np.outer(np.sin(u), np.sin(v))
-    z = np.outer(np.ones(np.size(u)), np.cos(v))
-
-    # Flatten the coordinates for plotting
-    x = x.flatten()
-    y = y.flatten()
-    z = z.flatten()
-
-    # Create the wireframe by connecting points along u and v directions
-    edges_u = []
-    edges_v = []
-
-    # Create edges along u direction (latitudinal)
-    for i in range(len(u)):
-        for j in range(len(v) - 1):
-            edges_u.append([i * len(v) + j, i * len(v) + (j + 1)])
+    wireframe = create_sphere_wireframe()
 
-    # Create edges along v direction (longitudinal)
-    for j in range(len(v)):
-        for i in range(len(u) - 1):
-            edges_v.append([i * len(v) + j, (i + 1) * len(v) + j])
-
-    # Create the wireframe plot
     fig = go.Figure()
 
-    # Add wireframe edges
-    for edge in edges_u + edges_v:
-        fig.add_trace(go.Scatter3d(
-            x=[x[edge[0]], x[edge[1]]],
-            y=[y[edge[0]], y[edge[1]]],
-            z=[z[edge[0]], z[edge[1]]],
-            mode='lines',
-            line=dict(color='grey', width=2),
-            showlegend=False
-        ))
+    # The whole wireframe is a single trace, so the sphere renders as one WebGL draw call
+    fig.add_trace(go.Scatter3d(
+        x=wireframe[0],
+        y=wireframe[1],
+        z=wireframe[2],
+        mode='lines',
+        line=dict(color='grey', width=2),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+
+    # Bloch vectors of every qubit, filled in on the client for the selected step and shot
+    fig.add_trace(go.Scatter3d(
+        name='Ideal',
+        mode='lines+text',
+        line=dict(color='#1c7ed6', width=6),
+        textposition='top center',
+    ))
+    fig.add_trace(go.Scatter3d(
+        name='Noisy',
+        mode='lines+text',
+        line=dict(color='red', width=6, dash='dash'),
+        textposition='top center',
+    ))
+
+    axis = dict(showbackground=False, range=[-1.1, 1.1])
 
     # Update layout
     fig.update_layout(
         scene=dict(
-            xaxis=dict(showbackground=False),
-            yaxis=dict(showbackground=False),
-            zaxis=dict(showbackground=False)
+            xaxis=axis,
+            yaxis=axis,
+            zaxis=axis,
+            aspectmode='cube'
         ),
         plot_bgcolor='#1e1e1e',  # Dark background
         paper_bgcolor='#1e1e1e',  # Dark paper background,
         font_color='#ffffff',
-        transition={'duration': 400, 'easing': "cubic-in-out"},
+        # Keep the camera when vectors are updated
+        uirevision='qsphere',
         margin={'t': 24, 'b': 24, 'l': 36, 'r': 36}
     )
 
+    # Vectors are precomputed for every step and shot in the simulation view, so moving between them stays in the browser
+    app.clientside_callback(
+        ClientsideFunction(namespace='qnex', function_name='updateBloch'),
+        Output('visualization-qsphere', 'figure'),
+        Input('simulation-view', 'data'),
+        Input('select-state-vector', 'value'),
+        Input('input-visualize-shot', 'value'),
+        State('visualization-qsphere', 'figure'),
+    )
+
     return dmc.Stack(
         [
             dmc.Title('Q-Sphere', order=4),
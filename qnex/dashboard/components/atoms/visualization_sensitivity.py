@@ -0,0 +1,98 @@
+import dash_mantine_components as dmc
+from dash import Input, Output, State, dcc, Patch, no_update
+import plotly.graph_objects as go
+
+from qnex.backend.base_simulator import SimulationBudgetError
+from qnex.backend.registry import SIMULATOR_REGISTRY
+
+
+def create_visualization_sensitivity(app):
+    fig = go.Figure()
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='black',
+        xaxis=dict(
+            zerolinecolor="#ebebeb",
+            gridcolor="#ebebeb",
+            tickfont_color="black",
+        ),
+        yaxis=dict(
+            autorange='reversed',  # Largest contribution on top
+            tickfont_color="black",
+        ),
+        xaxis_title="Contribution [%]",
+        barmode='group',
+        title="Noise Sensitivity<br><sup>Share of the infidelity and outcome distance removed without each gate's noise</sup>",
+        height=240,
+        margin={'t': 70, 'b': 24, 'l': 36, 'r': 36},
+    )
+
+    fig.add_trace(go.Bar(name='Infidelity', orientation='h', marker=dict(color='red')))
+    fig.add_trace(go.Bar(name='TVD', orientation='h', marker=dict(color='#1c7ed6')))
+
+    @app.long_callback(
+        Output('visualization-sensitivity', 'figure'),
+        Output('text-sensitivity-error', 'children'),
+        Input('btn-sensitivity-run', 'n_clicks'),
+        State('select-simulator-backend', 'value'),
+        State('input-qasm', 'value'),
+        State('input-shots', 'value'),
+        State('input-seed', 'value'),
+        State('noise-model', 'data'),
+        prevent_initial_call=True,
+        running=[
+            (Output("btn-sensitivity-run", "loading"), True, False),
+        ],
+    )
+    def update_sensitivity(_, simulator_ref, qasm_str, shots, seed, noise_params):
+        # Check if the simulator exists in the SIMULATOR_REGISTRY
+        simulator = SIMULATOR_REGISTRY.get(simulator_ref, None)
+
+        if not simulator or not qasm_str:
+            return no_update, None
+
+        try:
+            result = simulator.sensitivity(qasm_str, shots or 1, seed or None, noise_params or {})
+        except (SimulationBudgetError, ValueError, NotImplementedError) as e:
+            return no_update, str(e)
+
+        if not result.gates:
+            return no_update, "The noise model does not apply noise to any gate"
+
+        def share(contribution, baseline):
+            return 100 * contribution / baseline if baseline > 0 else 0
+
+        gates = [gate.gate for gate in result.gates]
+
+        # Hover shows the raw metrics of the ablated and doubled runs behind every bar
+        patched = Patch()
+        patched['data'][0]['y'] = gates
+        patched['data'][0]['x'] = [share(gate.infidelity_contribution, result.baseline_infidelity) for gate in result.gates]
+        patched['data'][0]['hovertext'] = [
+            f"removed {gate.infidelity_removed:.4f}, doubled {gate.infidelity_doubled:.4f}, baseline {result.baseline_infidelity:.4f}"
+            for gate in result.gates
+        ]
+        patched['data'][1]['y'] = gates
+        patched['data'][1]['x'] = [share(gate.tvd_contribution, result.baseline_tvd) for gate in result.gates]
+        patched['data'][1]['hovertext'] = [
+            f"removed {gate.tvd_removed:.4f}, doubled {gate.tvd_doubled:.4f}, baseline {result.baseline_tvd:.4f}"
+            for gate in result.gates
+        ]
+        patched['layout']['height'] = 160 + 40 * len(gates)
+
+        return patched, None
+
+    return dmc.Stack(
+        [
+            dmc.Button(
+                "Analyze sensitivity",
+                id="btn-sensitivity-run",
+                size="xs",
+                variant="light",
+            ),
+            dmc.Text(id="text-sensitivity-error", c="red", size="sm"),
+            dcc.Graph(id='visualization-sensitivity', figure=fig),
+        ],
+        gap="xs"
+    )
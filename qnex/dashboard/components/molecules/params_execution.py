@@ -1,22 +1,101 @@
 from dataclasses import asdict
+from typing import Optional
 
 import dash_mantine_components as dmc
-from dash import State, Input, Output
+from dash import State, Input, Output, no_update
 from dash_iconify import DashIconify
 
+from qnex.backend.base_simulator import SimulationBudgetError
 from qnex.backend.registry import SIMULATOR_REGISTRY
+from qnex.backend.types import SimulationOptions, SimulationResult
+from qnex.utils.export import store_export
+from qnex.utils.metrics import span
+
+
+def summarize_comparison(result: SimulationResult) -> dict:
+    """Reduce the result of a compared noise profile to what is overlaid in the charts."""
+    return {
+        'fidelity': result.fidelity,
+        'noisy_counts': result.noisy_counts,
+        'probabilities': {name: [sv.probabilities for sv in svs] for name, svs in result.noisy.items()},
+    }
+
+
+def parse_parameter_values(text: Optional[str]) -> Optional[dict[str, float]]:
+    """Parse "theta=0.5, phi=1.2" into parameter values by name, raising ValueError for malformed input."""
+    if not text or not text.strip():
+        return None
+
+    values = {}
+    for assignment in text.split(","):
+        name, separator, value = assignment.partition("=")
+
+        if not separator or not name.strip():
+            raise ValueError(f"Expected name=value for circuit parameter, got '{assignment.strip()}'")
+
+        values[name.strip()] = float(value)
+
+    return values
+
+
+def build_options(repetitions, shards, stored_trajectories, adaptive, target_standard_error, transpile, optimization_level,
+                  parameters: Optional[dict[str, float]] = None) -> SimulationOptions:
+    """Turn the execution and noise inputs into simulation options, shared by the run and the cost estimate."""
+    return SimulationOptions(
+        repetitions=repetitions or 1,
+        shards=shards or 1,
+        stored_trajectories=stored_trajectories or None,
+        adaptive=bool(adaptive),
+        target_standard_error=(target_standard_error or 1) / 100,
+        transpile=bool(transpile),
+        optimization_level=int(optimization_level or 1),
+        parameters=parameters,
+    )
+
+
+def describe_fallback(requested: SimulationOptions, fitted: SimulationOptions) -> Optional[str]:
+    """Describe how the budget fallback made the outputs sparser, or None when the requested options fit."""
+    changes = []
+
+    if requested.store_statevectors and not fitted.store_statevectors:
+        changes.append("statevectors will not be kept")
+    if fitted.snapshot_stride != requested.snapshot_stride:
+        changes.append(f"only every {fitted.snapshot_stride}th state will be saved")
+    if fitted.stored_trajectories != requested.stored_trajectories:
+        changes.append(f"only {fitted.stored_trajectories} trajectories will be stored")
+
+    return f"over budget, {', '.join(changes)}" if changes else None
+
+
+def format_bytes(num_bytes: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+    return f"{num_bytes:.1f} TB"
 
 
 def create_params_execution(app):
     @app.long_callback(
         Output('simulation-results', 'data'),
+        Output('text-simulation-error', 'children'),
         Input('btn-simulation-run', 'n_clicks'),
         State('select-simulator-backend', 'value'),
         State('input-qasm', 'value'),
         State('input-shots', 'value'),
         State('input-seed', 'value'),
+        State('input-repetitions', 'value'),
+        State('input-shards', 'value'),
+        State('input-stored-trajectories', 'value'),
+        State('switch-adaptive-shots', 'checked'),
+        State('input-target-standard-error', 'value'),
+        State('switch-transpile', 'checked'),
+        State('select-optimization-level', 'value'),
         State('select-noise-model', 'value'),
+        State('select-noise-model-compare', 'value'),
         State('noise-model', 'data'),
+        State('input-parameters', 'value'),
         prevent_initial_call=True,
         running=[
             (Output("btn-simulation-run", "loading"), True, False),
@@ -24,22 +103,143 @@ def create_params_execution(app):
         ],
         cancel=[Input("btn-simulation-cancel", "n_clicks")],
     )
-    def display_values(_, simulator_ref, qasm_str, shots, seed, noise_model_name, noise_params):
+    def display_values(_, simulator_ref, qasm_str, shots, seed, repetitions, shards, stored_trajectories, adaptive, target_standard_error, transpile, optimization_level,
+                       noise_model_name, compare_profiles, noise_params, parameter_text):
         # Check if the simulator exists in the SIMULATOR_REGISTRY
         simulator = SIMULATOR_REGISTRY.get(simulator_ref, None)
 
         if not simulator:
             # Return an empty array if simulator does not exist
-            return []
+            return [], None
 
         if not seed:
             seed = None
 
-        # Simulate the circuit with ideal and noisy conditions
-        result = simulator.simulate(qasm_str, shots or 1, seed, noise_model_name, noise_params)
+        try:
+            parameters = parse_parameter_values(parameter_text)
+        except ValueError as e:
+            return no_update, str(e)
+
+        options = build_options(repetitions, shards, stored_trajectories, adaptive, target_standard_error, transpile, optimization_level,
+                                parameters)
+
+        compare_profiles = [profile for profile in compare_profiles or [] if profile != noise_model_name]
+
+        if compare_profiles and options.transpile:
+            # Every transpiled profile runs its own circuit, so their steps and qubits cannot be overlaid on the same charts
+            return no_update, "Comparing noise profiles is not supported together with transpiling, turn one of them off"
+
+        try:
+            if not compare_profiles:
+                # Simulate the circuit with ideal and noisy conditions
+                result = simulator.simulate(qasm_str, shots or 1, seed, noise_model_name, noise_params, options)
+
+                # Return the processed results, the full result stays on the server for the download
+                with span("serialization"):
+                    processed = asdict(result)
+                    processed['export_id'] = store_export(result)
+
+                return processed, None
+
+            # Simulate all profiles in one batch that shares the parsed circuit and the ideal run
+            results = simulator.simulate_many(qasm_str, shots or 1, seed, [noise_model_name] + compare_profiles, noise_params, options)
+        except (SimulationBudgetError, ValueError) as e:
+            # Budget violations and missing parameter values are reported next to the run button
+            return no_update, str(e)
+
+        with span("serialization"):
+            processed = asdict(results[noise_model_name])
+            processed['export_id'] = store_export(results[noise_model_name])
+            processed['profile'] = noise_model_name
+            processed['comparisons'] = {profile: summarize_comparison(results[profile]) for profile in compare_profiles}
+
+        return processed, None
+
+    @app.callback(
+        Output('text-cost-estimate', 'children'),
+        Input('select-simulator-backend', 'value'),
+        Input('input-qasm', 'value'),
+        Input('input-shots', 'value'),
+        Input('input-repetitions', 'value'),
+        Input('input-shards', 'value'),
+        Input('input-stored-trajectories', 'value'),
+        Input('switch-adaptive-shots', 'checked'),
+        Input('input-target-standard-error', 'value'),
+        Input('switch-transpile', 'checked'),
+        Input('select-optimization-level', 'value'),
+        Input('select-noise-model', 'value'),
+        Input('select-noise-model-compare', 'value'),
+    )
+    def update_cost_estimate(simulator_ref, qasm_str, shots, repetitions, shards, stored_trajectories, adaptive, target_standard_error,
+                             transpile, optimization_level, noise_model_name, compare_profiles):
+        # Check if the simulator exists in the SIMULATOR_REGISTRY
+        simulator = SIMULATOR_REGISTRY.get(simulator_ref, None)
+
+        if not simulator:
+            return None
 
-        # Return the processed results
-        return asdict(result)
+        # Parameter values do not change the cost, so they are left out
+        options = build_options(repetitions, shards, stored_trajectories, adaptive, target_standard_error, transpile, optimization_level)
+        compare_profiles = [profile for profile in compare_profiles or [] if profile != noise_model_name]
+
+        try:
+            if compare_profiles:
+                # Estimated the same way as the batch that simulates all profiles at once
+                fitted, estimate = simulator.fit_to_budget(qasm_str, shots or 1, options, runs=len(compare_profiles) + 1, streaming=False)
+            else:
+                fitted, estimate = simulator.fit_to_budget(qasm_str, shots or 1, options, runs=simulator.concurrent_repetitions(options))
+        except SimulationBudgetError as e:
+            return f"{e}, the simulation will be refused"
+        except Exception:
+            # The circuit cannot be parsed yet while it is being edited
+            return None
+
+        summary = (f"Estimated {format_bytes(estimate.memory_bytes)} memory, {format_bytes(estimate.payload_bytes)} results, "
+                   f"~{estimate.runtime_seconds:.1f} s")
+
+        fallback = describe_fallback(options, fitted)
+        if fallback:
+            summary += f" ({fallback})"
+
+        return summary
+
+    @app.callback(
+        Output('text-shots-used', 'children'),
+        Input('simulation-results', 'data'),
+        prevent_initial_call=True,
+    )
+    def update_shots_used(simulation_results):
+        if not simulation_results or not simulation_results.get('adaptive'):
+            return None
+
+        adaptive = simulation_results['adaptive']
+        reasons = {
+            "precision": "target precision reached",
+            "shot_budget": "shot budget exhausted",
+            "time_budget": "time budget exhausted",
+        }
+
+        return (f"Used {adaptive['shots']} shots in {adaptive['batches']} batches, "
+                f"{reasons.get(adaptive['stop_reason'], adaptive['stop_reason'])}")
+
+    @app.callback(
+        Output('link-results-export', 'href'),
+        Output('link-results-export', 'style'),
+        Input('simulation-results', 'data'),
+        prevent_initial_call=True,
+    )
+    def update_results_export(simulation_results):
+        if not simulation_results or not simulation_results.get('export_id'):
+            return None, {'display': 'none'}
+
+        return f"/export/{simulation_results['export_id']}.npz", {'display': 'block'}
+
+    @app.callback(
+        Output('input-target-standard-error', 'disabled'),
+        Input('switch-adaptive-shots', 'checked'),
+    )
+    def toggle_target_standard_error(adaptive):
+        return not adaptive
 
     return dmc.Stack([
         dmc.Title("Execution", order=4),
@@ -60,6 +260,55 @@ def create_params_execution(app):
             min=1,
             max=99999,
         ),
+        dmc.NumberInput(
+            id='input-repetitions',
+            label="Repetitions",
+            description="Independent seeds derived from the randomization seed, used to compute confidence intervals",
+            value=1,
+            min=1,
+            max=64,
+        ),
+        dmc.NumberInput(
+            id='input-shards',
+            label="Shards",
+            description="Split the shots over parallel worker processes, the same seed and shard count always give the same results",
+            value=1,
+            min=1,
+            max=64,
+        ),
+        dmc.TextInput(
+            id='input-parameters',
+            label="Circuit parameters",
+            description="Values of the circuit's OpenQASM 3 input parameters, e.g. theta=0.5, phi=1.2",
+            placeholder="No parameters",
+        ),
+        dmc.NumberInput(
+            id='input-stored-trajectories',
+            label="Stored trajectories",
+            description="Keep the states of only this many randomly chosen shots for inspection, all shots still count towards the statistics",
+            placeholder="All shots",
+            value=None,
+            min=1,
+            max=8192,
+        ),
+        dmc.Switch(
+            id='switch-adaptive-shots',
+            label="Adaptive shots",
+            description="Run shots in batches and stop early once the estimates are precise enough, the shots above act as the budget",
+            checked=False,
+        ),
+        dmc.NumberInput(
+            id='input-target-standard-error',
+            label="Target standard error",
+            description="Precision of the outcome probabilities and mean fidelity at which the adaptive mode stops",
+            value=1,
+            min=0.01,
+            max=50,
+            step=0.1,
+            decimalScale=2,
+            rightSection="%",
+            disabled=True,
+        ),
         dmc.Flex(
             children=[
                 dmc.Button('Run', id="btn-simulation-run", color='lime', fullWidth=True),
@@ -74,6 +323,16 @@ def create_params_execution(app):
             ],
             gap="xs",
         ),
+        dmc.Text(id='text-cost-estimate', size="sm", c="dimmed"),
+        dmc.Text(id='text-shots-used', size="sm"),
+        dmc.Anchor(
+            "Download results (.npz)",
+            id='link-results-export',
+            href=None,
+            size="sm",
+            style={'display': 'none'},
+        ),
+        dmc.Text(id='text-simulation-error', size="sm", c="red"),
         dmc.Text(
             [
                 "Or use the ",
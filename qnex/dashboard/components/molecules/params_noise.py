@@ -1,11 +1,15 @@
 import base64
 import json
+import logging
 
 import dash_mantine_components as dmc
 from dash import dcc, Output, Input, State, ALL, ctx
 
 from qnex.backend.registry import SIMULATOR_REGISTRY
 from qnex.backend.types import NoiseParameterType
+from qnex.dashboard.components.atoms.visualization_sensitivity import create_visualization_sensitivity
+
+logger = logging.getLogger(__name__)
 
 
 def create_probability_slider(noise_param: NoiseParameterType, value: int = 0):
@@ -97,6 +101,7 @@ NOISE_PARAM_COMPONENT_MAP = {
 def create_params_noise(app):
     @app.callback(
         Output('select-noise-model', 'data'),
+        Output('select-noise-model-compare', 'data'),
         Input('select-simulator-backend', 'value'),
     )
     def update_noise_models(simulator_ref):
@@ -105,12 +110,12 @@ def create_params_noise(app):
 
         if not simulator:
             # Return an empty array if simulator does not exist
-            return []
+            return [], []
 
         profiles = [{"label": profile, "value": profile} for profile in simulator.supported_profiles()]
         custom = [{"label": "Custom", "value": "custom"}]
 
-        return profiles + custom
+        return profiles + custom, profiles + custom
 
     @app.callback(
         Output('noise-model-editor', 'style'),
@@ -143,7 +148,7 @@ def create_params_noise(app):
             contents_decoded = base64.b64decode(b64_part).decode('utf-8')
 
             noise_model = json.loads(contents_decoded)
-            print("Importing noise model", noise_model)
+            logger.info("Importing noise model %s", noise_model)
 
             return noise_model, None
         except Exception as e:
@@ -279,6 +284,27 @@ def create_params_noise(app):
             id="select-noise-model",
             data=[]
         ),
+        dmc.MultiSelect(
+            label="Compare with",
+            placeholder="Select models to compare",
+            description="Run the selected models in the same simulation and overlay them in the charts",
+            id="select-noise-model-compare",
+            data=[],
+            value=[],
+            clearable=True,
+        ),
+        dmc.Switch(
+            id='switch-transpile',
+            label="Transpile to device",
+            description="Map the circuit onto the basis gates and coupling map of the selected device before applying its noise",
+            checked=False,
+        ),
+        dmc.Select(
+            label="Optimization level",
+            id="select-optimization-level",
+            data=[{"label": str(level), "value": str(level)} for level in range(4)],
+            value="1",
+        ),
         dmc.Stack([
             dmc.Divider(label="Model editor", variant="dashed"),
             dmc.Group(
@@ -320,7 +346,9 @@ def create_params_noise(app):
                 id="noise-gate-params",
                 children=[],
                 gap="xl"
-            )
+            ),
+            dmc.Divider(label="Sensitivity", variant="dashed"),
+            create_visualization_sensitivity(app),
         ],
             id="noise-model-editor",
             style={"display": "none"}
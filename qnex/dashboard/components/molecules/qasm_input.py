@@ -22,6 +22,8 @@ def create_qasm_input(app):
             autosize=True,
             minRows=20,
             maxRows=40,
+            # Parsing, cost estimation and the diagram only run once typing pauses, not on every keystroke
+            debounce=400,
             value=default_qasm_circuit
         )
     ])
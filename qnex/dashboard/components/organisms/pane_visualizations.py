@@ -1,11 +1,105 @@
 import dash_mantine_components as dmc
-from dash import Output, Input, State
+import numpy as np
+from dash import Output, Input, State, ClientsideFunction, dcc
+from dash_iconify import DashIconify
 
 from qnex.backend.registry import SIMULATOR_REGISTRY
 from qnex.dashboard.components.atoms.visualization_circuit_diagram import create_visualization_circuit_diagram
-from qnex.dashboard.components.atoms.visualization_counts import create_visualization_shots
+from qnex.dashboard.components.atoms.visualization_counts import create_visualization_shots, create_error_bars
+from qnex.dashboard.components.atoms.visualization_entanglement import create_visualization_entanglement
 from qnex.dashboard.components.atoms.visualization_fidelity import create_visualization_fidelity
 from qnex.dashboard.components.atoms.visualization_probabilities import create_visualization_probabilities
+from qnex.dashboard.components.atoms.visualization_qsphere import create_visualization_qsphere
+from qnex.utils.quantum import compute_bloch_vectors
+
+
+# Time between two steps while animating through the circuit
+PLAY_FRAME_INTERVAL_MS = 500
+
+
+def build_simulation_view(simulation_results: dict) -> dict:
+    """
+    Build the compact payload the clientside callbacks index into when scrubbing through steps and shots.
+
+    Per step and shot it only holds rounded probabilities, counts and per-qubit Bloch vectors, statevectors stay on the
+    server side.
+    """
+    basis_states = simulation_results['basis_states']
+    steps = list(simulation_results['ideal'].keys())
+
+    def per_shot(branch, key, decimals=None):
+        values = {
+            step: np.array([shot[key] for shot in simulation_results[branch][step]], dtype=float)
+            for step in steps
+        }
+
+        return {step: (np.round(value, decimals) if decimals is not None else value).tolist() for step, value in values.items()}
+
+    diagnostics = simulation_results.get('diagnostics')
+    has_shot_counts = simulation_results['ideal'][steps[0]][0]['counts'] is not None
+
+    def per_shot_bloch(branch):
+        if diagnostics:
+            vectors = np.round(np.asarray(diagnostics[branch]['bloch_vectors'], dtype=float), 3)
+        elif not simulation_results[branch][steps[0]][0]['state_vector']:
+            # Neither diagnostics nor statevectors were kept, so there is nothing to draw on the sphere
+            return None
+        else:
+            # Statevectors are serialized as (re, im) pairs, all steps and shots are reduced in a single batch
+            serialized = np.array([[shot['state_vector'] for shot in simulation_results[branch][step]] for step in steps], dtype=float)
+            vectors = np.round(compute_bloch_vectors(serialized[..., 0] + 1j * serialized[..., 1]), 3)
+
+        return {step: vectors[index].tolist() for index, step in enumerate(steps)}
+
+    statistics = simulation_results.get('statistics')
+    final_counts = {
+        'ideal': [simulation_results['ideal_counts'].get(state, 0) for state in basis_states],
+        'noisy': [simulation_results['noisy_counts'].get(state, 0) for state in basis_states],
+        'ideal_error': None,
+        'noisy_error': None,
+    }
+
+    if statistics and statistics['ideal_counts'] is not None:
+        # Show the mean counts across repetitions with their confidence interval
+        for branch in ['ideal', 'noisy']:
+            estimate = statistics[f'{branch}_counts']
+            error = create_error_bars(estimate)
+
+            final_counts[branch] = np.asarray(estimate['mean']).tolist()
+            final_counts[f'{branch}_error'] = {**error, 'array': np.asarray(error['array']).tolist(),
+                                               'arrayminus': np.asarray(error['arrayminus']).tolist()}
+
+    comparisons = {
+        profile: {
+            'final_counts': [comparison['noisy_counts'].get(state, 0) for state in basis_states],
+            'probabilities': {step: np.round(np.asarray(comparison['probabilities'][step], dtype=float), 3).tolist() for step in steps},
+        }
+        for profile, comparison in (simulation_results.get('comparisons') or {}).items()
+    }
+
+    return {
+        'basis_states': basis_states,
+        'steps': steps,
+        'operations': simulation_results.get('operations') or [],
+        # Only the stored trajectories can be selected, which can be fewer than the shots that were run
+        'shots': len(simulation_results['ideal'][steps[0]]),
+        'ideal_probabilities': per_shot('ideal', 'probabilities', 3),
+        'noisy_probabilities': per_shot('noisy', 'probabilities', 3),
+        # Counts of the whole shot ensemble per step, per-shot histograms only when they were sampled
+        'ideal_counts': {step: np.asarray(simulation_results['ideal_step_counts'][step]).tolist() for step in steps},
+        'noisy_counts': {step: np.asarray(simulation_results['noisy_step_counts'][step]).tolist() for step in steps},
+        'ideal_shot_counts': per_shot('ideal', 'counts') if has_shot_counts else None,
+        'noisy_shot_counts': per_shot('noisy', 'counts') if has_shot_counts else None,
+        'ideal_bloch': per_shot_bloch('ideal'),
+        'noisy_bloch': per_shot_bloch('noisy'),
+        # Mean entanglement entropy of every qubit per step, as (qubits, steps)
+        'entropy': {
+            branch: np.round(np.mean(np.asarray(diagnostics[branch]['entropy'], dtype=float), axis=1).T, 3).tolist()
+            for branch in ['ideal', 'noisy']
+        } if diagnostics else None,
+        'final_counts': final_counts,
+        'comparisons': comparisons,
+    }
 
 
 def create_visualizations(app):
@@ -25,7 +119,8 @@ def create_visualizations(app):
             return []
 
         supported_ops = simulator.supported_operations()
-        used_ops = ["init"] + simulator.used_operations(qasm_str)
+        # Transpiled runs execute different operations than the ones in the QASM input
+        used_ops = simulator_results.get('operations') or ["init"] + simulator.used_operations(qasm_str)
 
         simulator_results_ideal = simulator_results['ideal']
         sv_keys = [key for key in simulator_results_ideal.keys() if key.startswith('sv')]
@@ -38,42 +133,50 @@ def create_visualizations(app):
         ]
 
     @app.callback(
-        Output('select-state-vector', 'value'),
-        Input('select-state-vector', 'value'),
+        Output('simulation-view', 'data'),
         Input('simulation-results', 'data'),
-        prevent_initial_call=True
     )
-    def update_state_vector_select_value(current_state_vector, simulator_results):
-        print(f"Selected {current_state_vector}")
+    def update_simulation_view(simulation_results):
+        if not simulation_results:
+            return None
 
-        if current_state_vector is not None:
-            return current_state_vector
-
-        simulator_results_ideal = simulator_results['ideal']
-        sv_keys = list(simulator_results_ideal.keys())
+        return build_simulation_view(simulation_results)
 
-        return sv_keys[-1]
+    # Selection only indexes into the already computed view, so it runs in the browser without server round trips
+    app.clientside_callback(
+        ClientsideFunction(namespace='qnex', function_name='selectStateVector'),
+        Output('select-state-vector', 'value'),
+        Input('select-state-vector', 'value'),
+        Input('simulation-view', 'data'),
+        Input('interval-visualization-play', 'n_intervals'),
+        prevent_initial_call=True
+    )
 
-    @app.callback(
+    app.clientside_callback(
+        ClientsideFunction(namespace='qnex', function_name='updateVisualizeShotMax'),
         Output('input-visualize-shot', 'max'),
         Output('input-visualize-shot', 'marks'),
-        Input('input-shots', 'value')
+        Input('input-shots', 'value'),
+        Input('simulation-view', 'data'),
     )
-    def update_visualize_shot_max(shots):
-        shots = shots or 1
-        marks = [
-            {"value": 0, "label": "1"},
-            {"value": shots - 1, "label": str(shots)},
-        ]
 
-        return shots, marks
+    app.clientside_callback(
+        ClientsideFunction(namespace='qnex', function_name='togglePlay'),
+        Output('interval-visualization-play', 'disabled'),
+        Output('btn-visualization-play', 'variant'),
+        Input('btn-visualization-play', 'n_clicks'),
+        State('interval-visualization-play', 'disabled'),
+        prevent_initial_call=True
+    )
 
     return dmc.Stack(
         [
+            dcc.Store(id='simulation-view'),
             dmc.Title("Visualization", order=4),
             dmc.Stack(
                 [
                     create_visualization_fidelity(app),
+                    create_visualization_entanglement(app),
                     create_visualization_circuit_diagram(app),
                 ],
                 gap="0"
@@ -95,11 +198,20 @@ def create_visualizations(app):
                                     id='input-visualize-shot',
                                     min=1,
                                     max=100,
-                                    value=1
+                                    value=1,
+                                    updatemode="drag",
                                 ),
                             ],
                             w='100%'
                         ),
+                        dmc.ActionIcon(
+                            DashIconify(icon="clarity:play-solid", width=20),
+                            id='btn-visualization-play',
+                            size="lg",
+                            variant="light",
+                            mt="lg",
+                        ),
+                        dcc.Interval(id='interval-visualization-play', interval=PLAY_FRAME_INTERVAL_MS, disabled=True),
                     ],
                     gap='md'
                 ),
@@ -112,6 +224,10 @@ def create_visualizations(app):
                         dmc.GridCol(
                             create_visualization_probabilities(app),
                             span=6
+                        ),
+                        dmc.GridCol(
+                            create_visualization_qsphere(app),
+                            span=6
                         )
                     ],
                     gutter='md'
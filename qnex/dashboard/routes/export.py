@@ -0,0 +1,21 @@
+from flask import Blueprint, Response, abort
+
+from qnex.utils.export import load_export, result_arrays, stream_npz
+
+export_blueprint = Blueprint("export", __name__)
+
+
+@export_blueprint.route("/export/<export_id>.npz")
+def export_npz(export_id: str):
+    result = load_export(export_id)
+
+    if result is None:
+        # Unknown or expired export
+        abort(404)
+
+    # The archive is encoded while it is sent, so large results are never materialized as one response body
+    return Response(
+        stream_npz(result_arrays(result)),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="qnex-results-{export_id}.npz"'},
+    )
@@ -0,0 +1,230 @@
+import re
+
+import numpy as np
+from flask import Blueprint, Response, abort, jsonify, request
+
+from qnex.backend.registry import SIMULATOR_REGISTRY
+from qnex.backend.types import SimulationOptions
+from qnex.utils.export import load_export, result_arrays, stream_npz
+from qnex.utils.jobs import get_job, submit_job
+
+jobs_blueprint = Blueprint("jobs", __name__, url_prefix="/api")
+
+# Steps returned per page when no limit is given, and the most a single page may hold
+DEFAULT_PAGE_STEPS = 16
+MAX_PAGE_STEPS = 256
+
+# Same limits as the dashboard inputs
+MAX_SHOTS = 8192
+MAX_REPETITIONS = 64
+MAX_SHARDS = 64
+
+# Options a client may set, as name -> (type, lowest, highest, nullable). The memory budget, its fallback and result
+# caching are left out, so they always keep the server's defaults
+CLIENT_OPTIONS = {
+    'repetitions': (int, 1, MAX_REPETITIONS, False),
+    'confidence': (float, 0.5, 0.999, False),
+    'adaptive': (bool, None, None, False),
+    'target_standard_error': (float, 1e-4, 0.5, False),
+    'batch_shots': (int, 1, MAX_SHOTS, False),
+    'time_budget': (float, 0.1, 3600, True),
+    'shards': (int, 1, MAX_SHARDS, False),
+    'transpile': (bool, None, None, False),
+    'optimization_level': (int, 0, 3, False),
+    'transpile_seed': (int, 0, 2 ** 31 - 1, False),
+    'snapshot_stride': (int, 1, None, False),
+    'diagnostics': (bool, None, None, False),
+    'observables': (dict, None, None, True),
+    'store_statevectors': (bool, None, None, False),
+    'stored_trajectories': (int, 1, MAX_SHOTS, True),
+    'per_shot_counts': (bool, None, None, False),
+    'analytic_readout': (bool, None, None, False),
+    'parameters': (dict, None, None, True),
+}
+
+PAULI_LABEL = re.compile(r"[IXYZ]+")
+
+
+def _bad_request(message: str):
+    return jsonify({"error": message}), 400
+
+
+def _finished_result(job_id: str):
+    """Return the result of a finished job, or abort with the status that explains why there is none."""
+    job = get_job(job_id)
+
+    if job is None:
+        abort(404)
+    if job['status'] != 'done':
+        # Not there yet, or failed
+        abort(409)
+
+    result = load_export(job_id)
+    if result is None:
+        # Expired from the result cache
+        abort(410)
+
+    return result
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_option(name: str, value):
+    """Raise ValueError when a client option has the wrong type or is out of range."""
+    kind, lowest, highest, nullable = CLIENT_OPTIONS[name]
+
+    if value is None:
+        if not nullable:
+            raise ValueError(f"'{name}' must not be null")
+        return
+
+    if kind is bool:
+        valid = isinstance(value, bool)
+    elif kind is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif kind is float:
+        valid = _is_number(value)
+    else:
+        valid = isinstance(value, dict)
+
+    if not valid:
+        raise ValueError(f"'{name}' must be of type {kind.__name__}")
+
+    if (lowest is not None and value < lowest) or (highest is not None and value > highest):
+        raise ValueError(f"'{name}' must be between {lowest} and {highest if highest is not None else 'unbounded'}")
+
+    if name == 'parameters' and not all(_is_number(parameter) for parameter in value.values()):
+        raise ValueError("'parameters' must map every parameter name to a number")
+
+    if name == 'observables':
+        for terms in value.values():
+            if not isinstance(terms, dict) or not all(PAULI_LABEL.fullmatch(label) and _is_number(coefficient)
+                                                      for label, coefficient in terms.items()):
+                raise ValueError("'observables' must map every name to {Pauli label: coefficient}")
+
+
+def _parse_options(raw) -> SimulationOptions:
+    """Build simulation options from the whitelisted fields a client sent, raising ValueError for anything else."""
+    if raw is None:
+        return SimulationOptions()
+
+    if not isinstance(raw, dict):
+        raise ValueError("'options' must be an object")
+
+    unknown = sorted(set(raw) - set(CLIENT_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unsupported options: {', '.join(unknown)}")
+
+    for name, value in raw.items():
+        _check_option(name, value)
+
+    return SimulationOptions(**raw)
+
+
+@jobs_blueprint.post("/jobs")
+def create_job():
+    """
+    Submit a simulation and return its job id without waiting for it.
+
+    Expects {"qasm": str, "shots": int, "seed": int?, "profile": str?, "noise_params": dict?, "backend": str?,
+    "options": dict?}, where profile is a device profile or "custom" together with noise_params, and options holds
+    fields of SimulationOptions a client may set, see CLIENT_OPTIONS.
+    """
+    body = request.get_json(silent=True)
+
+    if not isinstance(body, dict) or not isinstance(body.get('qasm'), str):
+        return _bad_request("Expected a JSON object with a 'qasm' program")
+
+    simulator_ref = body.get('backend', 'qiskit')
+
+    # Check if the simulator exists in the SIMULATOR_REGISTRY
+    simulator = SIMULATOR_REGISTRY.get(simulator_ref, None) if isinstance(simulator_ref, str) else None
+    if simulator is None:
+        return _bad_request(f"Unknown backend '{simulator_ref}'")
+
+    shots, seed = body.get('shots', 1024), body.get('seed')
+    if isinstance(shots, bool) or not isinstance(shots, int) or not 1 <= shots <= MAX_SHOTS \
+            or (seed is not None and (isinstance(seed, bool) or not isinstance(seed, int))):
+        return _bad_request(f"'shots' must be an integer between 1 and {MAX_SHOTS} and 'seed' an integer or null")
+
+    profile, noise_params = body.get('profile'), body.get('noise_params')
+    if (profile is not None and not isinstance(profile, str)) or (noise_params is not None and not isinstance(noise_params, dict)):
+        return _bad_request("'profile' must be a string and 'noise_params' an object, or null")
+
+    try:
+        options = _parse_options(body.get('options'))
+    except ValueError as e:
+        return _bad_request(f"Invalid options: {e}")
+
+    job_id = submit_job(simulator_ref, body['qasm'], shots, seed, profile, noise_params, options)
+
+    return jsonify({"job_id": job_id, "status": "queued"}), 202, {"Location": f"/api/jobs/{job_id}"}
+
+
+@jobs_blueprint.get("/jobs/<job_id>")
+def job_status(job_id: str):
+    job = get_job(job_id)
+
+    if job is None:
+        abort(404)
+
+    return jsonify(job)
+
+
+@jobs_blueprint.get("/jobs/<job_id>/result.npz")
+def job_result_npz(job_id: str):
+    result = _finished_result(job_id)
+
+    return Response(
+        stream_npz(result_arrays(result)),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="qnex-job-{job_id}.npz"'},
+    )
+
+
+@jobs_blueprint.get("/jobs/<job_id>/result")
+def job_result_page(job_id: str):
+    """
+    Return a page of steps of a finished job as JSON, selected with ?offset=&limit=.
+
+    Every step holds the mean outcome probabilities over all stored shots and the counts of the shot ensemble, the
+    per-shot probabilities are included with ?shots=true. Statevectors are only part of the .npz download.
+    """
+    result = _finished_result(job_id)
+
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(request.args.get('limit', DEFAULT_PAGE_STEPS, type=int), MAX_PAGE_STEPS)
+    include_shots = request.args.get('shots', 'false').lower() == 'true'
+
+    if offset < 0 or limit < 1:
+        return _bad_request("'offset' must not be negative and 'limit' must be positive")
+
+    names = list(result.noisy)[offset:offset + limit]
+    steps = []
+
+    for index, name in enumerate(names, start=offset):
+        step = {"name": name, "operation": result.operations[index], "fidelity": float(result.fidelity[index])}
+
+        for branch, svs, step_counts in [("ideal", result.ideal[name], result.ideal_step_counts),
+                                         ("noisy", result.noisy[name], result.noisy_step_counts)]:
+            probabilities = np.array([sv.probabilities for sv in svs], dtype=float) / 100
+
+            step[f"{branch}_probabilities"] = probabilities.mean(axis=0).tolist()
+            step[f"{branch}_counts"] = np.asarray(step_counts[name]).tolist() if name in step_counts else None
+            if include_shots:
+                step[f"{branch}_shot_probabilities"] = probabilities.tolist()
+
+        steps.append(step)
+
+    return jsonify({
+        "job_id": job_id,
+        "basis_states": result.basis_states,
+        "shots": result.shots,
+        "total_steps": len(result.noisy),
+        "offset": offset,
+        "limit": limit,
+        "steps": steps,
+        "final_counts": {"ideal": result.ideal_counts, "noisy": result.noisy_counts},
+    })
@@ -0,0 +1,37 @@
+import time
+
+from flask import Blueprint, Response, g, request
+
+from qnex.utils.metrics import CALLBACK_DURATION, CALLBACK_PAYLOAD, observe, render_metrics
+
+metrics_blueprint = Blueprint("metrics", __name__)
+
+# Every server-side Dash callback is a POST to this route, with the callback's outputs in the request body
+DASH_CALLBACK_PATH = "/_dash-update-component"
+
+
+@metrics_blueprint.before_app_request
+def start_callback_timer():
+    if request.path == DASH_CALLBACK_PATH:
+        g.callback_start = time.perf_counter()
+
+
+@metrics_blueprint.after_app_request
+def record_callback_metrics(response):
+    start = g.pop("callback_start", None)
+
+    if start is not None:
+        body = request.get_json(silent=True) or {}
+        # Label by the outputs, which identify the callback (the function name is not part of the request)
+        callback = body.get("output", "unknown")
+
+        observe(CALLBACK_DURATION, time.perf_counter() - start, callback=callback)
+        if response.content_length is not None:
+            observe(CALLBACK_PAYLOAD, response.content_length, callback=callback)
+
+    return response
+
+
+@metrics_blueprint.get("/metrics")
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
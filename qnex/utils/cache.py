@@ -0,0 +1,37 @@
+import os
+import threading
+from typing import Any, Callable
+
+# Directory of the caches shared between threads, processes and gunicorn workers
+CACHE_DIRECTORY = os.environ.get("QNEX_CACHE_DIR", os.path.abspath("./.cache"))
+CACHE_SIZE_LIMIT = int(os.environ.get("QNEX_CACHE_SIZE_LIMIT", 4 * 1024 ** 3))
+
+_caches: dict[tuple[str, int], Any] = {}
+_caches_lock = threading.Lock()
+_missing = object()
+
+
+def get_shared_cache(name: str):
+    """Return the named disk-backed cache, which is safe to use concurrently from threads and processes."""
+    import diskcache
+
+    # SQLite connections must not be shared across a fork, so every process opens its own handle
+    key = (name, os.getpid())
+
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = diskcache.FanoutCache(os.path.join(CACHE_DIRECTORY, name), shards=8, size_limit=CACHE_SIZE_LIMIT)
+
+        return _caches[key]
+
+
+def get_or_compute(name: str, key: str, compute: Callable[[], Any]) -> Any:
+    """Return the cached value for a key, computing and storing it on a miss."""
+    cache = get_shared_cache(name)
+
+    value = cache.get(key, default=_missing)
+    if value is _missing:
+        value = compute()
+        cache.set(key, value)
+
+    return value
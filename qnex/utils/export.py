@@ -0,0 +1,132 @@
+import io
+import uuid
+import zipfile
+from typing import Iterator, Optional
+
+import numpy as np
+
+from qnex.backend.types import SimulationResult
+from qnex.utils.cache import get_shared_cache
+
+# Results stay downloadable for this long after the run, they are evicted with the rest of the cache when it is full
+EXPORT_EXPIRY_SECONDS = 60 * 60
+# Uncompressed bytes written to the archive between two chunks sent to the client
+EXPORT_CHUNK_BYTES = 4 * 1024 ** 2
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Write-only, unseekable stream that collects what the zip writer produces until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+def store_export(result: SimulationResult, export_id: Optional[str] = None) -> str:
+    """Keep a result on the server so it can be downloaded by any worker, returning its export id."""
+    export_id = export_id or uuid.uuid4().hex
+    get_shared_cache("exports").set(export_id, result, expire=EXPORT_EXPIRY_SECONDS)
+
+    return export_id
+
+
+def load_export(export_id: str) -> Optional[SimulationResult]:
+    return get_shared_cache("exports").get(export_id, default=None)
+
+
+def result_arrays(result: SimulationResult) -> Iterator[tuple[str, np.ndarray]]:
+    """
+    Yield the arrays of a result by name, one step at a time.
+
+    Per-shot statevectors are only converted back to complex arrays when their step is reached, so at most one step is
+    held as an array at once.
+    """
+    yield "basis_states", np.array(result.basis_states)
+    yield "operations", np.array(result.operations)
+    yield "fidelity", np.asarray(result.fidelity, dtype=float)
+
+    for branch, steps, counts, step_counts in [
+        ("ideal", result.ideal, result.ideal_counts, result.ideal_step_counts),
+        ("noisy", result.noisy, result.noisy_counts, result.noisy_step_counts),
+    ]:
+        # Final measurement counts keep Aer's keys, which can contain register separators
+        yield f"{branch}/counts/keys", np.array(list(counts))
+        yield f"{branch}/counts/values", np.array(list(counts.values()), dtype=np.int64)
+
+        for name, svs in steps.items():
+            yield f"{branch}/probabilities/{name}", np.array([sv.probabilities for sv in svs], dtype=float) / 100
+
+            if svs and len(svs[0].state_vector):
+                pairs = np.array([sv.state_vector for sv in svs], dtype=float)
+                yield f"{branch}/statevectors/{name}", pairs[..., 0] + 1j * pairs[..., 1]
+
+            if svs and svs[0].counts is not None:
+                yield f"{branch}/shot_counts/{name}", np.array([sv.counts for sv in svs], dtype=np.int64)
+
+        for name, histogram in step_counts.items():
+            yield f"{branch}/step_counts/{name}", np.asarray(histogram, dtype=np.int64)
+
+    if result.readout_probabilities:
+        for name, probabilities in result.readout_probabilities.items():
+            yield f"noisy/readout_probabilities/{name}", np.asarray(probabilities, dtype=float)
+
+    if result.diagnostics:
+        for branch, diagnostics in result.diagnostics.items():
+            yield f"{branch}/bloch_vectors", diagnostics.bloch_vectors
+            yield f"{branch}/purity", diagnostics.purity
+            yield f"{branch}/entropy", diagnostics.entropy
+            yield f"{branch}/half_cut_entropy", diagnostics.half_cut_entropy
+
+    if result.observables:
+        for branch, estimates in result.observables.items():
+            yield f"{branch}/observables/names", np.array(estimates.names)
+            yield f"{branch}/observables/mean", estimates.mean
+            yield f"{branch}/observables/standard_error", estimates.standard_error
+
+
+def stream_npz(arrays: Iterator[tuple[str, np.ndarray]], compresslevel: int = 1) -> Iterator[bytes]:
+    """
+    Encode named arrays as a compressed .npz archive, yielding it in chunks while it is written.
+
+    Arrays are written in slices along their first axis, so neither the archive nor a single array's encoding is held in
+    memory as a whole. A low compression level keeps large downloads bound by the network rather than by deflate.
+    """
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as archive:
+        for name, array in arrays:
+            array = np.ascontiguousarray(array)
+
+            with archive.open(f"{name}.npy", mode="w", force_zip64=True) as entry:
+                np.lib.format.write_array_header_1_0(entry, np.lib.format.header_data_from_array_1_0(array))
+
+                if array.ndim == 0 or array.dtype.hasobject:
+                    entry.write(array.tobytes())
+                else:
+                    row_bytes = max(array[0].nbytes if len(array) else 1, 1)
+                    rows = max(EXPORT_CHUNK_BYTES // row_bytes, 1)
+
+                    for start in range(0, len(array), rows):
+                        entry.write(array[start:start + rows].tobytes())
+
+                        chunk = buffer.drain()
+                        if chunk:
+                            yield chunk
+
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+
+    # Central directory written when the archive is closed
+    yield buffer.drain()
@@ -0,0 +1,9 @@
+import hashlib
+import json
+
+
+def stable_hash(*parts) -> str:
+    """Hash JSON-serializable parts into a key that is stable across processes and restarts."""
+    serialized = json.dumps(parts, sort_keys=True, default=str)
+
+    return hashlib.sha256(serialized.encode()).hexdigest()
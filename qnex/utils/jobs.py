@@ -0,0 +1,77 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from qnex.backend.types import SimulationOptions
+from qnex.utils.cache import get_shared_cache
+from qnex.utils.export import store_export, EXPORT_EXPIRY_SECONDS
+from qnex.utils.parallel import submit_background, set_default_workers
+
+logger = logging.getLogger(__name__)
+
+# Job records outlive their results a little, so a finished job can still report that its result expired
+JOB_EXPIRY_SECONDS = 2 * EXPORT_EXPIRY_SECONDS
+
+
+def _update_job(job_id: str, **fields):
+    cache = get_shared_cache("jobs")
+
+    # Records are only written by the submitting request and the single process running the job, never concurrently
+    job = cache.get(job_id, default=None) or {'job_id': job_id}
+    job.update(fields)
+    cache.set(job_id, job, expire=JOB_EXPIRY_SECONDS)
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """Return the record of a job, with an estimated progress while it is running."""
+    job = get_shared_cache("jobs").get(job_id, default=None)
+
+    if job is not None and job['status'] == 'running':
+        # Simulations do not report progress, the cost estimate stands in for it
+        elapsed = time.time() - job['started_at']
+        job['progress'] = min(elapsed / job['estimated_seconds'], 0.99) if job.get('estimated_seconds') else None
+
+    return job
+
+
+def submit_job(simulator_ref: str, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str,
+               noise_params: Optional[dict], options: SimulationOptions) -> str:
+    """Queue a simulation on the shared worker pool and return its job id right away."""
+    job_id = uuid.uuid4().hex
+
+    _update_job(job_id, status='queued', submitted_at=time.time(), started_at=None, finished_at=None,
+                progress=0.0, error=None)
+    submit_background(run_job, job_id, simulator_ref, qasm_str, shots, seed, noise_profile_name, noise_params, options)
+
+    return job_id
+
+
+def run_job(job_id: str, simulator_ref: str, qasm_str: str, shots: int, seed: Optional[int], noise_profile_name: str,
+            noise_params: Optional[dict], options: SimulationOptions):
+    """Run a queued simulation, storing its result under the job id. Runs in a worker process or background thread."""
+    from qnex.backend.base_simulator import SimulationBudgetError
+    from qnex.backend.registry import SIMULATOR_REGISTRY
+
+    # A job already runs on its own worker, so the simulation itself must not fan out again
+    set_default_workers(1)
+
+    try:
+        simulator = SIMULATOR_REGISTRY[simulator_ref]
+
+        _update_job(job_id, status='running', started_at=time.time(),
+                    estimated_seconds=simulator.estimate_cost(qasm_str, shots, options).runtime_seconds)
+
+        result = simulator.simulate(qasm_str, shots, seed, noise_profile_name, noise_params, options)
+        store_export(result, job_id)
+    except (SimulationBudgetError, ValueError, KeyError) as e:
+        _update_job(job_id, status='failed', finished_at=time.time(), error=str(e))
+        return
+    except Exception as e:
+        # Unexpected errors are reported to the client as well, so a polling script never waits forever
+        logger.exception("Error running job %s: %s", job_id, e)
+        _update_job(job_id, status='failed', finished_at=time.time(), error=f"{type(e).__name__}: {e}")
+        return
+
+    _update_job(job_id, status='done', finished_at=time.time(), progress=1.0, shots=result.shots,
+                num_steps=len(result.operations))
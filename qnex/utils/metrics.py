@@ -0,0 +1,119 @@
+import logging
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from qnex.utils.cache import get_shared_cache
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, math.inf)
+# From 1 KB to 1 GB
+SIZE_BUCKETS = tuple(1024 * 4 ** power for power in range(11)) + (math.inf,)
+
+# Sums are stored as integer counters, in millionths of the observed unit
+SUM_SCALE = 1_000_000
+
+
+@dataclass(frozen=True)
+class Histogram:
+    name: str
+    help: str
+    buckets: tuple
+
+
+STAGE_DURATION = Histogram(
+    "qnex_stage_duration_seconds",
+    "Duration of the stages of a simulation, such as parsing, the Aer runs and post-processing",
+    DURATION_BUCKETS,
+)
+CALLBACK_DURATION = Histogram("qnex_callback_duration_seconds", "Server-side latency of Dash callbacks", DURATION_BUCKETS)
+CALLBACK_PAYLOAD = Histogram("qnex_callback_payload_bytes", "Size of the responses of Dash callbacks", SIZE_BUCKETS)
+
+HISTOGRAMS = [STAGE_DURATION, CALLBACK_DURATION, CALLBACK_PAYLOAD]
+
+
+def _format_labels(labels: dict) -> str:
+    escaped = {key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for key, value in sorted(labels.items())}
+
+    return ",".join(f'{key}="{value}"' for key, value in escaped.items())
+
+
+def observe(histogram: Histogram, value: float, **labels):
+    """
+    Record an observation in a histogram shared by every process.
+
+    Observations from the dashboard workers and the simulation pool all end up in the same disk-backed counters, so the
+    metrics route reports the whole deployment rather than the process that happens to serve it.
+    """
+    series = (histogram.name, _format_labels(labels))
+
+    try:
+        cache = get_shared_cache("metrics")
+
+        # Only the bucket the value falls in is counted, the cumulative counts are formed when rendering
+        bucket = next(bound for bound in histogram.buckets if value <= bound)
+
+        cache.incr(series + ("bucket", bucket))
+        cache.incr(series + ("sum",), int(value * SUM_SCALE))
+    except Exception as e:
+        # Metrics must never break the code path they measure
+        logger.warning("Could not record metric %s: %s", histogram.name, e)
+
+
+@contextmanager
+def span(stage: str, **labels):
+    """Time a stage of a simulation, logging it and recording it in the stage duration histogram."""
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+
+        logger.debug("Stage %s took %.3f s %s", stage, duration, labels or "")
+        observe(STAGE_DURATION, duration, stage=stage, **labels)
+
+
+def render_metrics() -> str:
+    """Render every histogram in the Prometheus text exposition format."""
+    cache = get_shared_cache("metrics")
+
+    # Bucket counts and sums by histogram and label set
+    series: dict[tuple[str, str], dict] = {}
+    for key in cache:
+        if not isinstance(key, tuple) or len(key) < 3:
+            continue
+
+        name, labels, kind = key[:3]
+        entry = series.setdefault((name, labels), {"buckets": {}, "sum": 0})
+        value = cache.get(key, default=0)
+
+        if kind == "bucket":
+            entry["buckets"][key[3]] = value
+        elif kind == "sum":
+            entry["sum"] = value
+
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.append(f"# HELP {histogram.name} {histogram.help}")
+        lines.append(f"# TYPE {histogram.name} histogram")
+
+        for (name, labels), entry in sorted(series.items()):
+            if name != histogram.name:
+                continue
+
+            separator = "," if labels else ""
+            selector = f"{{{labels}}}" if labels else ""
+            cumulative = 0
+
+            for bound in histogram.buckets:
+                cumulative += entry["buckets"].get(bound, 0)
+                le = "+Inf" if math.isinf(bound) else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels}{separator}le="{le}"}} {cumulative}')
+
+            lines.append(f"{name}_sum{selector} {entry['sum'] / SUM_SCALE}")
+            lines.append(f"{name}_count{selector} {cumulative}")
+
+    return "\n".join(lines) + "\n"
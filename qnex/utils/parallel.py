@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+# Executors are keyed by the pid that created them, a forked child must not use the copies it inherited
+_pool: Optional[tuple[int, ProcessPoolExecutor]] = None
+_background: Optional[tuple[int, ThreadPoolExecutor]] = None
+_pool_lock = threading.Lock()
+_max_workers: Optional[int] = None
+
+
+def default_workers() -> int:
+    """Return the number of worker processes, configurable through the QNEX_WORKERS environment variable."""
+    if _max_workers is not None:
+        return _max_workers
+
+    return int(os.environ.get("QNEX_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def set_default_workers(max_workers: int):
+    """Override the number of worker processes, must be called before the pool is first used."""
+    global _max_workers
+    _max_workers = max(int(max_workers), 1)
+
+
+def _start_context():
+    # Workers forked from a process in which Aer already ran inherit its OpenMP state and deadlock, so they are started
+    # from a clean server process instead
+    methods = multiprocessing.get_all_start_methods()
+
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by all parallel simulation work, creating it on first use."""
+    global _pool
+
+    with _pool_lock:
+        # The inherited executor shares its call and result queues with the parent's, so a forked process opens its own
+        if _pool is None or _pool[0] != os.getpid():
+            _pool = (os.getpid(), ProcessPoolExecutor(max_workers=default_workers(), mp_context=_start_context()))
+
+        return _pool[1]
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """Submit work to the shared process pool, or run it inline when only a single worker is configured."""
+    if default_workers() > 1:
+        return get_process_pool().submit(fn, *args, **kwargs)
+
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+
+    return future
+
+
+def submit_background(fn: Callable, *args, **kwargs) -> Future:
+    """Submit work that must not block the caller, on a background thread when only a single worker is configured."""
+    global _background
+
+    if default_workers() > 1:
+        return get_process_pool().submit(fn, *args, **kwargs)
+
+    with _pool_lock:
+        # Threads do not survive a fork, so the inherited executor would never run anything
+        if _background is None or _background[0] != os.getpid():
+            _background = (os.getpid(), ThreadPoolExecutor(max_workers=1))
+
+        background = _background[1]
+
+    return background.submit(fn, *args, **kwargs)
+
+
+def parallel_map(fn: Callable, *iterables: Iterable) -> list:
+    """Apply a function to every set of arguments on the shared process pool, preserving the input order."""
+    futures = [submit(fn, *args) for args in zip(*iterables)]
+
+    return [future.result() for future in futures]
@@ -10,3 +10,163 @@ def compute_quantum_fidelity(sv1, sv2):
     fidelity = np.abs(np.vdot(sv1, sv2)) ** 2
 
     return fidelity
+
+
+def compute_batched_fidelity(svs1, svs2):
+    """Compute the fidelity between each pair of state vectors in two (shots, 2^n) arrays."""
+    svs1 = np.asarray(svs1)
+    svs2 = np.asarray(svs2)
+
+    overlaps = np.abs(np.sum(np.conj(svs1) * svs2, axis=-1)) ** 2
+    norms = np.sum(np.abs(svs1) ** 2, axis=-1) * np.sum(np.abs(svs2) ** 2, axis=-1)
+
+    return overlaps / norms
+
+
+def compute_reduced_density_matrices(statevectors):
+    """Compute the single-qubit reduced density matrix of every qubit for (..., 2^n) state vectors, as (..., n, 2, 2)."""
+    statevectors = np.asarray(statevectors)
+    batch_shape = statevectors.shape[:-1]
+    num_qubits = int(np.log2(statevectors.shape[-1]))
+
+    states = statevectors.reshape(-1, *([2] * num_qubits))
+    norms = np.sum(np.abs(states.reshape(len(states), -1)) ** 2, axis=-1)
+
+    matrices = np.empty((len(states), num_qubits, 2, 2), dtype=complex)
+    for qubit in range(num_qubits):
+        # Qubits are little-endian, so qubit 0 is the last tensor axis and the others are traced out
+        amplitudes = np.moveaxis(states, num_qubits - qubit, -1).reshape(len(states), -1, 2)
+        matrices[:, qubit] = np.einsum('bri,brj->bij', amplitudes, np.conj(amplitudes))
+
+    matrices /= norms[:, None, None, None]
+
+    return matrices.reshape(*batch_shape, num_qubits, 2, 2)
+
+
+def density_matrices_to_bloch_vectors(reduced_density_matrices):
+    """Return the Bloch vectors of (..., 2, 2) single-qubit density matrices, as (..., 3)."""
+    rho = np.asarray(reduced_density_matrices)
+
+    return np.stack([
+        2 * rho[..., 0, 1].real,
+        2 * rho[..., 1, 0].imag,
+        (rho[..., 0, 0] - rho[..., 1, 1]).real,
+    ], axis=-1)
+
+
+def compute_bloch_vectors(statevectors):
+    """Compute the Bloch vector of every qubit for (..., 2^n) state vectors, as (..., n, 3)."""
+    return density_matrices_to_bloch_vectors(compute_reduced_density_matrices(statevectors))
+
+
+def compute_purities(reduced_density_matrices):
+    """Compute Tr(rho^2) of (..., d, d) density matrices, which for Hermitian matrices is the sum of squared magnitudes."""
+    return np.sum(np.abs(np.asarray(reduced_density_matrices)) ** 2, axis=(-2, -1))
+
+
+def compute_entropies(eigenvalues):
+    """Compute the von Neumann entropy in bits from the (..., d) eigenvalues of density matrices."""
+    eigenvalues = np.clip(np.asarray(eigenvalues), 0, None)
+    eigenvalues = eigenvalues / np.sum(eigenvalues, axis=-1, keepdims=True)
+
+    # Zero eigenvalues contribute nothing, log2(1) keeps them out of the sum without warnings
+    return -np.sum(eigenvalues * np.log2(np.where(eigenvalues > 0, eigenvalues, 1)), axis=-1)
+
+
+def compute_qubit_entropies(bloch_vectors):
+    """
+    Compute the von Neumann entropy in bits of every qubit's reduced state from (..., 3) Bloch vectors.
+
+    For pure states this is the entanglement entropy between the qubit and the rest of the register.
+    """
+    length = np.clip(np.linalg.norm(bloch_vectors, axis=-1), 0, 1)
+
+    return compute_entropies(np.stack([(1 + length) / 2, (1 - length) / 2], axis=-1))
+
+
+def compute_bipartite_entropies(statevectors, cut: int):
+    """
+    Compute the entanglement entropy in bits between qubits [0, cut) and the rest for (..., 2^n) pure state vectors.
+
+    The state is reshaped into a matrix over both halves, so the spectrum comes from the smaller of its two Gram
+    matrices instead of a partial trace per state.
+    """
+    statevectors = np.asarray(statevectors)
+    batch_shape = statevectors.shape[:-1]
+    num_qubits = int(np.log2(statevectors.shape[-1]))
+
+    if cut <= 0 or cut >= num_qubits:
+        return np.zeros(batch_shape)
+
+    # Qubits are little-endian, so the first `cut` qubits form the fastest varying index
+    matrices = statevectors.reshape(-1, 2 ** (num_qubits - cut), 2 ** cut)
+
+    if matrices.shape[1] < matrices.shape[2]:
+        gram = np.einsum('bir,bjr->bij', matrices, np.conj(matrices))
+    else:
+        gram = np.einsum('bri,brj->bij', np.conj(matrices), matrices)
+
+    return compute_entropies(np.linalg.eigvalsh(gram)).reshape(batch_shape)
+
+
+def compute_pauli_expectations(statevectors, label: str):
+    """
+    Compute <psi|P|psi> of a Pauli string for (..., 2^n) state vectors, as (...).
+
+    The label is little-endian like Qiskit's, so its last character acts on qubit 0. Instead of building the operator,
+    X and Y flip the bits of the basis index, while Z and Y contribute a sign given by the parity of the masked index.
+    """
+    statevectors = np.asarray(statevectors)
+    num_qubits = int(np.log2(statevectors.shape[-1]))
+
+    if len(label) != num_qubits or set(label) - set("IXYZ"):
+        raise ValueError(f"Pauli label '{label}' does not describe {num_qubits} qubits")
+
+    flip_mask = sum(1 << qubit for qubit, pauli in enumerate(reversed(label)) if pauli in "XY")
+    sign_mask = sum(1 << qubit for qubit, pauli in enumerate(reversed(label)) if pauli in "YZ")
+
+    indices = np.arange(2 ** num_qubits)
+    parity = np.zeros(len(indices), dtype=int)
+    for qubit in range(num_qubits):
+        if sign_mask >> qubit & 1:
+            parity ^= indices >> qubit & 1
+
+    # Y = iXZ, so every Y adds a global factor of i
+    phase = 1j ** label.count("Y")
+    signs = phase * (1 - 2 * parity)
+
+    expectations = np.sum(np.conj(statevectors[..., indices ^ flip_mask]) * signs * statevectors, axis=-1)
+    norms = np.sum(np.abs(statevectors) ** 2, axis=-1)
+
+    return expectations.real / norms
+
+
+def apply_readout_confusion(probabilities, confusion):
+    """
+    Apply per-qubit readout confusion matrices to (..., 2^n) probability vectors exactly, as (..., 2^n).
+
+    The (n, 2, 2) matrices hold P(measured | prepared) with the prepared state as row. The full 2^n x 2^n confusion matrix is
+    their tensor product, so it is applied one qubit axis at a time on the reshaped probability tensor.
+    """
+    probabilities = np.asarray(probabilities, dtype=float)
+    batch_shape = probabilities.shape[:-1]
+    num_qubits = len(confusion)
+
+    tensor = probabilities.reshape(-1, *([2] * num_qubits))
+    for qubit in range(num_qubits):
+        # Qubits are little-endian, so qubit 0 is the last tensor axis
+        axis = num_qubits - qubit
+        tensor = np.moveaxis(np.tensordot(tensor, confusion[qubit], axes=([axis], [0])), -1, axis)
+
+    return tensor.reshape(*batch_shape, 2 ** num_qubits)
+
+
+def apply_readout_flips(outcomes, confusion, rng):
+    """Flip every bit of (shots, n) measured outcomes with the probability its (n, 2, 2) confusion matrix assigns it."""
+    outcomes = np.asarray(outcomes, dtype=int)
+    confusion = np.asarray(confusion)
+
+    columns = np.arange(outcomes.shape[1])
+    flip_probabilities = confusion[columns, outcomes, 1 - outcomes]
+
+    return outcomes ^ (rng.random(outcomes.shape) < flip_probabilities)
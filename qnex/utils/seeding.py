@@ -0,0 +1,18 @@
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+def spawn_seeds(seed: Optional[int], count: int) -> list[int]:
+    """Derive independent, reproducible simulator seeds from a single master seed."""
+    children = np.random.SeedSequence(seed).spawn(count)
+
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def seed_stream(seed: Optional[int]) -> Iterator[int]:
+    """Yield an endless, reproducible stream of independent simulator seeds derived from a master seed."""
+    sequence = np.random.SeedSequence(seed)
+
+    while True:
+        yield int(sequence.spawn(1)[0].generate_state(1)[0])
@@ -0,0 +1,25 @@
+import numpy as np
+
+
+def mean_confidence_interval(samples, confidence: float = 0.95):
+    """
+    Compute the mean, sample standard deviation and Student-t confidence interval along the first axis.
+
+    Returns a tuple of (mean, std, ci_low, ci_high) arrays with the shape of a single sample.
+    """
+    samples = np.asarray(samples, dtype=float)
+    count = samples.shape[0]
+
+    mean = samples.mean(axis=0)
+
+    if count < 2:
+        # A single sample carries no information about the spread
+        std = np.zeros_like(mean)
+        return mean, std, mean, mean
+
+    from scipy import stats
+
+    std = samples.std(axis=0, ddof=1)
+    half_width = stats.t.ppf((1 + confidence) / 2, count - 1) * std / np.sqrt(count)
+
+    return mean, std, mean - half_width, mean + half_width
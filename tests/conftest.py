@@ -0,0 +1,31 @@
+"""
+Shared setup of the regression tests.
+
+The tests run against their own cache directory, so results cached by earlier runs or the dashboard are never reused.
+"""
+import os
+import tempfile
+
+# Must be set before qnex.utils.cache is first imported
+os.environ.setdefault("QNEX_CACHE_DIR", tempfile.mkdtemp(prefix="qnex-tests-"))
+
+import pytest  # noqa: E402
+
+from qnex.utils import parallel  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def simulator():
+    from qnex.backend.qiskit.qiskit_simulator import QiskitSimulator
+
+    return QiskitSimulator()
+
+
+@pytest.fixture
+def workers():
+    """Set the number of worker processes for a single test, restoring the previous setting afterwards."""
+    previous = parallel._max_workers
+
+    yield parallel.set_default_workers
+
+    parallel._max_workers = previous
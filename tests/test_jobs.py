@@ -0,0 +1,87 @@
+"""The asynchronous job API, from submitting a simulation to downloading its result."""
+import io
+import time
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from qnex.dashboard.routes.jobs import jobs_blueprint
+
+BELL = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+creg c[2];
+h q[0];
+cx q[0],q[1];
+measure q -> c;
+"""
+
+NOISE_PARAMS = {"h": {"depolarizing": 5}, "cx": {"depolarizing": 5}}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(jobs_blueprint)
+
+    return app.test_client()
+
+
+def wait_for_job(client, job_id: str, timeout: float = 120) -> dict:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").get_json()
+
+        if job["status"] in ("done", "failed"):
+            return job
+
+        time.sleep(0.2)
+
+    raise TimeoutError(f"Job {job_id} did not finish within {timeout} s")
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_job_runs_to_result(client, workers, num_workers):
+    workers(num_workers)
+
+    response = client.post("/api/jobs", json={
+        "qasm": BELL, "shots": 64, "seed": 1, "profile": "custom", "noise_params": NOISE_PARAMS,
+        "options": {"repetitions": 2, "shards": 2},
+    })
+    assert response.status_code == 202
+
+    job_id = response.get_json()["job_id"]
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "done", job["error"]
+    assert job["job_id"] == job_id
+    assert job["shots"] == 64
+
+    page = client.get(f"/api/jobs/{job_id}/result?offset=0&limit=2").get_json()
+    assert page["total_steps"] == job["num_steps"]
+    assert len(page["steps"]) == 2
+    assert sum(page["final_counts"]["ideal"].values()) == 64
+
+    download = client.get(f"/api/jobs/{job_id}/result.npz")
+    assert download.status_code == 200
+
+    with np.load(io.BytesIO(download.get_data())) as arrays:
+        assert list(arrays["basis_states"]) == ["00", "01", "10", "11"]
+        assert len(arrays["fidelity"]) == job["num_steps"]
+
+
+@pytest.mark.parametrize("body", [
+    {"qasm": BELL, "backend": ["qiskit"]},
+    {"qasm": BELL, "shots": 0},
+    {"qasm": BELL, "options": {"memory_budget": None}},
+    {"qasm": BELL, "options": {"repetitions": 1000}},
+    {"qasm": BELL, "noise_params": [1]},
+])
+def test_invalid_jobs_are_rejected(client, body):
+    assert client.post("/api/jobs", json=body).status_code == 400
+
+
+def test_unknown_job(client):
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.get("/api/jobs/missing/result").status_code == 404
@@ -0,0 +1,60 @@
+"""Parallel runs on the process pool after Aer already ran in the calling process."""
+import numpy as np
+
+from qnex.backend.types import SimulationOptions
+
+GHZ = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[3];
+creg c[3];
+h q[0];
+cx q[0],q[1];
+cx q[1],q[2];
+measure q -> c;
+"""
+
+NOISE_PARAMS = {"h": {"depolarizing": 5}, "cx": {"depolarizing": 10}}
+
+
+def test_sharded_run_after_inline_run(simulator, workers):
+    workers(4)
+    options = SimulationOptions(cache_results=False, diagnostics=False)
+
+    # Runs Aer in this process before the pool is first used
+    inline = simulator.simulate(GHZ, 64, 1, "custom", NOISE_PARAMS, options)
+    sharded = simulator.simulate(GHZ, 64, 1, "custom", NOISE_PARAMS, SimulationOptions(shards=4, cache_results=False, diagnostics=False))
+
+    assert inline.shots == sharded.shots == 64
+    assert sum(sharded.noisy_counts.values()) == 64
+
+
+def test_sensitivity_on_pool(simulator, workers):
+    workers(2)
+
+    result = simulator.sensitivity(GHZ, 64, 1, NOISE_PARAMS)
+
+    assert {gate.gate for gate in result.gates} == {"h", "cx"}
+    assert 0 <= result.baseline_infidelity <= 1
+
+
+def test_shards_match_on_pool_and_inline(simulator, workers):
+    options = SimulationOptions(shards=3, cache_results=False, diagnostics=False)
+
+    workers(1)
+    inline = simulator.simulate(GHZ, 48, 7, "custom", NOISE_PARAMS, options)
+    workers(3)
+    pooled = simulator.simulate(GHZ, 48, 7, "custom", NOISE_PARAMS, options)
+
+    # Shards are merged in order, so the same seed and shard count give the same result wherever they run
+    assert inline.noisy_counts == pooled.noisy_counts
+    assert np.allclose(inline.fidelity, pooled.fidelity)
+
+
+def test_sensitivity_after_inline_run(simulator, workers):
+    workers(1)
+    simulator.simulate(GHZ, 32, 3, "custom", NOISE_PARAMS, SimulationOptions(cache_results=False, diagnostics=False))
+
+    workers(3)
+    result = simulator.sensitivity(GHZ, 32, 3, NOISE_PARAMS)
+
+    assert len(result.gates) == 2
@@ -0,0 +1,50 @@
+"""Confidence intervals of repeated runs over the final measurement counts."""
+import numpy as np
+import pytest
+
+from qnex.backend.types import SimulationOptions
+
+SPLIT_REGISTERS = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+creg a[1];
+creg b[1];
+x q[0];
+measure q[0] -> b[0];
+measure q[1] -> a[0];
+"""
+
+PARTIAL_MEASUREMENT = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+creg c[1];
+x q[1];
+measure q[1] -> c[0];
+"""
+
+
+@pytest.fixture
+def options(workers) -> SimulationOptions:
+    workers(1)
+
+    return SimulationOptions(repetitions=3, cache_results=False, diagnostics=False)
+
+
+def test_counts_are_arranged_by_measured_qubit(simulator, options):
+    result = simulator.simulate(SPLIT_REGISTERS, 32, 1, "custom", None, options)
+
+    # q[0] is always 1 and q[1] always 0, whichever register they were measured into
+    expected = np.zeros(4)
+    expected[result.basis_states.index("01")] = 32
+
+    for estimate in (result.statistics.ideal_counts, result.statistics.noisy_counts):
+        assert np.allclose(estimate.mean, expected)
+        assert np.allclose(estimate.ci_low, expected) and np.allclose(estimate.ci_high, expected)
+
+
+def test_counts_interval_is_skipped_for_partial_measurement(simulator, options):
+    result = simulator.simulate(PARTIAL_MEASUREMENT, 32, 1, "custom", None, options)
+
+    assert result.statistics.ideal_counts is None
+    assert result.statistics.noisy_counts is None
+    assert len(result.statistics.fidelity.mean) == len(result.fidelity)